@@ -1,7 +1,9 @@
+import os
 from flask import Flask, render_template
 from flask_cors import CORS
 from app.routes import api_bp
-from app.config.config import Config
+from app.config.config import Config, PRELOAD_MODELS, MODEL_BACKEND, MODEL_IMGSZ
+from app.model.ModelRegistry import model_registry
 
 
 def create_app():
@@ -14,6 +16,11 @@ def create_app():
     app.config.from_object(Config)
     app.register_blueprint(api_bp, url_prefix='/api')
 
+    # Load and warm up shared models once at boot
+    for model_path in PRELOAD_MODELS:
+        if os.path.exists(model_path):
+            model_registry.load(model_path, MODEL_BACKEND, MODEL_IMGSZ)
+
     # 添加主页面路由
     @app.route('/')
     def index():
@@ -0,0 +1,137 @@
+import math
+import torch
+import numpy as np
+from collections import deque
+from ultralytics.engine.results import Results
+
+
+class AdaptiveStride:
+    """
+    Runs the detector only every k-th frame and predicts track positions in between.
+
+    The stride k is tuned from the measured detection latency so that the average time
+    per frame stays within the budget of the target frame rate. Between detections the
+    boxes of the last tracked frame are moved with a constant-velocity model, so
+    trajectories, crossings and dwell times keep updating on every frame.
+    """
+
+    def __init__(self, target_fps=25.0, max_stride=8, smoothing=0.1):
+        """
+        Initialize the stride controller.
+
+        Args:
+            target_fps (float): Frame rate the service should keep up with.
+            max_stride (int): Largest allowed stride.
+            smoothing (float): Weight of the newest latency sample in the moving average.
+        """
+        self.target_fps = target_fps
+        self.max_stride = max_stride
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the stored tracks, the measured latency and the statistics.
+        """
+        self.stride = 1
+        self.latency = None  # Moving average of the detection + tracking latency (seconds)
+        self.frames_since_detection = 0
+
+        # State of the tracks at the last detection, one row per track
+        self.last_frame_index = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.xywh = np.empty((0, 4), dtype=np.float32)
+        self.velocity = np.empty((0, 2), dtype=np.float32)  # Pixels per frame
+        self.conf = np.empty(0, dtype=np.float32)
+        self.cls = np.empty(0, dtype=np.float32)
+
+        # Statistics over the last 100 detections
+        self.strides = deque(maxlen=100)
+        self.errors = deque(maxlen=100)
+
+    def should_detect(self):
+        """
+        Decide whether the detector has to run on the next frame.
+
+        Returns:
+            bool: True every stride frames, False on frames whose tracks are predicted.
+        """
+        self.frames_since_detection += 1
+        return self.last_frame_index is None or self.frames_since_detection >= self.stride
+
+    def observe_latency(self, seconds):
+        """
+        Feed the time spent on one detection and retune the stride.
+
+        Args:
+            seconds (float): Detection and tracking time of a frame.
+        """
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.smoothing * (seconds - self.latency)
+        self.stride = min(self.max_stride, max(1, math.ceil(self.latency * self.target_fps)))
+
+    def update(self, result, frame_index):
+        """
+        Store the tracks of a detected frame and measure how far the prediction was off.
+
+        Args:
+            result (Results): Tracked detection result of the frame.
+            frame_index (int): Index of the frame.
+        """
+        boxes = result.boxes.cpu().numpy()
+        ids = boxes.id.astype(np.int64) if boxes.id is not None else np.empty(0, dtype=np.int64)
+        xywh = boxes.xywh.astype(np.float32)[:len(ids)]
+        velocity = np.zeros((len(ids), 2), dtype=np.float32)
+
+        if self.last_frame_index is not None and len(ids) and len(self.ids):
+            elapsed = frame_index - self.last_frame_index
+            previous = {track_id: row for row, track_id in enumerate(self.ids)}
+            rows = np.array([previous.get(track_id, -1) for track_id in ids])
+            known = rows >= 0
+            if known.any():
+                prev_rows = rows[known]
+                predicted = self.xywh[prev_rows, :2] + self.velocity[prev_rows] * elapsed
+                if elapsed > 1:
+                    self.errors.append(float(np.linalg.norm(xywh[known, :2] - predicted, axis=1).mean()))
+                velocity[known] = (xywh[known, :2] - self.xywh[prev_rows, :2]) / elapsed
+
+        if self.last_frame_index is not None:
+            self.strides.append(frame_index - self.last_frame_index)
+        self.last_frame_index = frame_index
+        self.frames_since_detection = 0
+        self.ids, self.xywh, self.velocity = ids, xywh, velocity
+        self.conf = boxes.conf.astype(np.float32)[:len(ids)]
+        self.cls = boxes.cls.astype(np.float32)[:len(ids)]
+
+    def predict(self, frame, frame_index, names):
+        """
+        Predict the tracks of a frame that skips the detector.
+
+        Args:
+            frame: The current frame.
+            frame_index (int): Index of the frame.
+            names (dict): Class names of the detector.
+
+        Returns:
+            Results: Tracked boxes moved with their last velocity.
+        """
+        elapsed = frame_index - self.last_frame_index
+        xy = self.xywh[:, :2] + self.velocity * elapsed
+        half = self.xywh[:, 2:] / 2
+        data = np.column_stack([xy - half, xy + half, self.ids, self.conf, self.cls]).astype(np.float32)
+        return Results(frame, path="", names=names, boxes=torch.from_numpy(data.reshape(-1, 7)))
+
+    def get_statistics(self):
+        """
+        Report the effective stride and the prediction error.
+
+        Returns:
+            dict: Current stride, mean stride between detections and mean prediction error (pixels).
+        """
+        return {
+            "stride": self.stride,
+            "effective_stride": round(float(np.mean(self.strides)), 2) if self.strides else 1.0,
+            "prediction_error_px": round(float(np.mean(self.errors)), 2) if self.errors else None,
+        }
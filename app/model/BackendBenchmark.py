@@ -0,0 +1,134 @@
+"""
+Compare inference backends of a detector on a video file.
+
+Usage:
+    python -m app.model.BackendBenchmark --model yolov10n.pt --video videos/test.mp4 --backends onnx openvino
+
+For each backend the mean and p95 latency per frame are reported, together with how far
+its detections are from the PyTorch reference (recall/precision of matched boxes,
+mean IoU and mean confidence difference of the matches).
+"""
+import time
+import argparse
+import cv2
+import numpy as np
+from app.model.Detector import Detector
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Compute the IoU matrix of two sets of xyxy boxes.
+
+    Args:
+        boxes_a (ndarray): Nx4 boxes.
+        boxes_b (ndarray): Mx4 boxes.
+
+    Returns:
+        ndarray: NxM IoU matrix.
+    """
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + 1e-9)
+
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """
+    Greedily match the detections of a backend to the reference detections of the same class.
+
+    Args:
+        reference (Results): Reference (PyTorch) detection result.
+        candidate (Results): Detection result of the compared backend.
+        iou_threshold (float): Minimum IoU of a match.
+
+    Returns:
+        list: (iou, confidence difference) of each match.
+    """
+    ref_boxes, cand_boxes = reference.boxes.cpu().numpy(), candidate.boxes.cpu().numpy()
+    if len(ref_boxes) == 0 or len(cand_boxes) == 0:
+        return []
+    iou = box_iou(ref_boxes.xyxy, cand_boxes.xyxy)
+    iou[ref_boxes.cls[:, None] != cand_boxes.cls[None, :]] = 0
+    matches = []
+    while True:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        matches.append((float(iou[i, j]), abs(float(ref_boxes.conf[i]) - float(cand_boxes.conf[j]))))
+        iou[i, :] = 0
+        iou[:, j] = 0
+    return matches
+
+
+def compare_backends(model_path, video_path, backends, imgsz=640, max_frames=300):
+    """
+    Run every backend on the same frames and compare them with PyTorch.
+
+    Args:
+        model_path (str): Path to the .pt weights.
+        video_path (str): Video used for the comparison.
+        backends (list): Backends to compare with PyTorch.
+        imgsz (int): Inference image size.
+        max_frames (int): Maximum number of frames to use.
+
+    Returns:
+        dict: Statistics per backend.
+    """
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise ValueError(f"No frames could be read from {video_path}")
+
+    report = {}
+    reference = None
+    for backend in ["torch"] + [b for b in backends if b != "torch"]:
+        detector = Detector(model_path, backend, imgsz)
+        detector.warmup()
+        latencies, results = [], []
+        for frame in frames:
+            start_time = time.perf_counter()
+            # Boxes are compared at ultralytics' default threshold, not the low tracking one
+            results.append(detector.predict(frame, conf=0.25))
+            latencies.append(time.perf_counter() - start_time)
+
+        stats = {
+            "mean_latency_ms": round(1000 * float(np.mean(latencies)), 2),
+            "p95_latency_ms": round(1000 * float(np.percentile(latencies, 95)), 2),
+        }
+        if reference is None:
+            reference = results
+        else:
+            matches, ref_count, cand_count = [], 0, 0
+            for ref, cand in zip(reference, results):
+                matches.extend(match_detections(ref, cand))
+                ref_count += len(ref.boxes)
+                cand_count += len(cand.boxes)
+            stats.update({
+                "recall": round(len(matches) / ref_count, 4) if ref_count else None,
+                "precision": round(len(matches) / cand_count, 4) if cand_count else None,
+                "mean_iou": round(float(np.mean([m[0] for m in matches])), 4) if matches else None,
+                "mean_conf_diff": round(float(np.mean([m[1] for m in matches])), 4) if matches else None,
+            })
+        report[backend] = stats
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare detector backends against PyTorch")
+    parser.add_argument("--model", default="yolov10n.pt")
+    parser.add_argument("--video", default="videos/test.mp4")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "openvino"], choices=Detector.BACKENDS)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    for name, stats in compare_backends(args.model, args.video, args.backends, args.imgsz, args.frames).items():
+        print(f"{name}: {stats}")
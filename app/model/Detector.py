@@ -0,0 +1,135 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+import numpy as np
+from ultralytics import YOLO
+from app.config.config import DETECTION_CONF
+
+
+class Detector:
+    """
+    A loaded YOLO detector that can be shared by several services.
+    The detector only runs inference; tracking state is kept by each service.
+
+    Besides PyTorch, the weights can be run through ONNX Runtime or OpenVINO (optionally
+    INT8-quantized). The exported model is cached next to the weights, keyed by a hash of
+    the weights file and the image size, so the export only happens once.
+    """
+
+    BACKENDS = ("torch", "onnx", "openvino", "openvino-int8")
+
+    def __init__(self, model_path, backend="torch", imgsz=640):
+        """
+        Load the detector weights.
+
+        Args:
+            model_path (str): Path to the YOLO weights.
+            backend (str): Inference backend.
+            imgsz (int): Inference image size.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}")
+        self.model_path = model_path
+        self.backend = backend
+        self.imgsz = imgsz
+        self.weights = model_path if backend == "torch" else self.export(model_path, backend, imgsz)
+        self.model = YOLO(self.weights, task="detect")
+        self.names = self.model.names
+        # The ultralytics predictor is not thread-safe
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def export(model_path, backend, imgsz):
+        """
+        Export PyTorch weights for a backend, reusing a previous export of the same weights.
+
+        Args:
+            model_path (str): Path to the .pt weights.
+            backend (str): "onnx", "openvino" or "openvino-int8".
+            imgsz (int): Inference image size.
+
+        Returns:
+            str: Path to the exported model.
+        """
+        with open(model_path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:12]
+        root, _ = os.path.splitext(model_path)
+        int8 = backend == "openvino-int8"
+        if backend == "onnx":
+            target = f"{root}_{digest}_{imgsz}.onnx"
+        else:
+            # The "_openvino_model" suffix is how ultralytics recognizes OpenVINO models
+            target = f"{root}_{digest}_{imgsz}{'_int8' if int8 else ''}_openvino_model"
+        if os.path.exists(target):
+            return target
+
+        print(f"[Detector] Exporting {model_path} to {target}")
+        # Other services or batch workers may export the same weights at the same time, so each
+        # export works on its own copy of the weights and is moved into place in one step
+        work_dir = tempfile.mkdtemp(prefix=".export_", dir=os.path.dirname(os.path.abspath(model_path)))
+        try:
+            weights = shutil.copy(model_path, work_dir)
+            exported = YOLO(weights).export(format="onnx" if backend == "onnx" else "openvino",
+                                            imgsz=imgsz, dynamic=True, int8=int8)
+            try:
+                os.replace(exported, target)
+            except OSError:
+                # A concurrent export of a model directory got there first
+                if not os.path.exists(target):
+                    raise
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return target
+
+    def warmup(self):
+        """
+        Run one inference on a blank image so the first real frame does not pay the setup cost.
+        """
+        self.predict(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8))
+
+    def predict(self, frame, imgsz=None, conf=DETECTION_CONF):
+        """
+        Detect objects in a single frame.
+
+        Args:
+            frame: Input video frame.
+            imgsz (int, optional): Inference image size, defaults to the size the detector was loaded with.
+            conf (float): Confidence threshold.
+
+        Returns:
+            Results: Ultralytics detection result of the frame.
+        """
+        return self.predict_batch([frame], imgsz, conf)[0]
+
+    def predict_batch(self, frames, imgsz=None, conf=DETECTION_CONF):
+        """
+        Detect objects in several frames with one forward pass.
+
+        Args:
+            frames (list): Input video frames, possibly from different sources.
+            imgsz (int, optional): Inference image size, defaults to the size the detector was loaded with.
+            conf (float): Confidence threshold. The default keeps the boxes scored between
+                BoT-SORT's track_low_thresh and track_high_thresh for its second association pass.
+
+        Returns:
+            list: Ultralytics detection result of each frame.
+        """
+        with self.lock:
+            return self.model.predict(frames, imgsz=imgsz or self.imgsz, conf=conf, verbose=False)
+
+    def memory_bytes(self):
+        """
+        Estimate the memory held by the model weights.
+
+        Returns:
+            int: Size of all parameters and buffers in bytes, or of the exported model files
+                for other backends.
+        """
+        if self.backend != "torch":
+            if os.path.isdir(self.weights):
+                return sum(entry.stat().st_size for entry in os.scandir(self.weights) if entry.is_file())
+            return os.path.getsize(self.weights)
+        tensors = list(self.model.model.parameters()) + list(self.model.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
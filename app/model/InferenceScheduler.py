@@ -0,0 +1,136 @@
+import time
+import threading
+from collections import deque
+
+
+class InferenceScheduler:
+    """
+    Collects frames submitted by the services sharing a detector into micro-batches
+    and runs one batched forward pass per batch.
+
+    A batch is dispatched as soon as every registered service has submitted a frame,
+    the batch is full, or the oldest frame has waited for max_delay seconds.
+    Only frames requested at the same image size share a batch.
+    """
+
+    def __init__(self, detector, max_batch_size=8, max_delay=0.015):
+        """
+        Initialize the scheduler.
+
+        Args:
+            detector (Detector): The shared detector.
+            max_batch_size (int): Maximum number of frames in one forward pass.
+            max_delay (float): Maximum time (in seconds) a frame waits for the batch to fill.
+        """
+        self.detector = detector
+        self.names = detector.names
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.pending = []
+        self.clients = 0
+        self.condition = threading.Condition()
+        self.thread = None
+
+        # Batch statistics
+        self.batch_sizes = deque(maxlen=100)
+        self.batch_count = 0
+
+    def register(self):
+        """
+        Register a service that will submit frames, starting the scheduler thread if needed.
+        """
+        with self.condition:
+            self.clients += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def unregister(self):
+        """
+        Unregister a service so batches no longer wait for its frames.
+        """
+        with self.condition:
+            self.clients = max(0, self.clients - 1)
+            self.condition.notify_all()
+
+    def predict(self, frame, imgsz=None):
+        """
+        Submit a frame and block until its detection result is available.
+
+        Args:
+            frame: Input video frame.
+            imgsz (int, optional): Inference image size, defaults to the size of the detector.
+
+        Returns:
+            Results: Ultralytics detection result of the frame.
+        """
+        request = {"frame": frame, "imgsz": imgsz or self.detector.imgsz, "time": time.monotonic(),
+                   "done": threading.Event(), "result": None, "error": None}
+        with self.condition:
+            self.pending.append(request)
+            self.condition.notify_all()
+        request["done"].wait()
+        if request["error"] is not None:
+            raise request["error"]
+        return request["result"]
+
+    def next_batch(self):
+        """
+        Wait until a batch is ready to be dispatched and take it from the pending list.
+
+        Returns:
+            list: The requests of the batch.
+        """
+        with self.condition:
+            while not self.pending:
+                self.condition.wait()
+            deadline = self.pending[0]["time"] + self.max_delay
+            while len(self.pending) < min(self.max_batch_size, max(self.clients, 1)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            imgsz = self.pending[0]["imgsz"]
+            batch, rest = [], []
+            for request in self.pending:
+                if request["imgsz"] == imgsz and len(batch) < self.max_batch_size:
+                    batch.append(request)
+                else:
+                    rest.append(request)
+            self.pending = rest
+            return batch
+
+    def run(self):
+        """
+        Scheduler loop: dispatch batches to the detector and hand back the results.
+        """
+        while True:
+            batch = self.next_batch()
+            try:
+                results = self.detector.predict_batch([request["frame"] for request in batch], batch[0]["imgsz"])
+                for request, result in zip(batch, results):
+                    request["result"] = result
+            except Exception as e:
+                print(f"[InferenceScheduler] Error during batched inference: {e}")
+                for request in batch:
+                    request["error"] = e
+            self.batch_sizes.append(len(batch))
+            self.batch_count += 1
+            for request in batch:
+                request["done"].set()
+
+    def get_statistics(self):
+        """
+        Report batching statistics over the last 100 batches.
+
+        Returns:
+            dict: Number of batches, mean batch size and fill ratio (mean batch size / max batch size).
+        """
+        sizes = list(self.batch_sizes)
+        mean_size = sum(sizes) / len(sizes) if sizes else 0.0
+        return {
+            "batch_count": self.batch_count,
+            "clients": self.clients,
+            "mean_batch_size": round(mean_size, 2),
+            "batch_fill_ratio": round(mean_size / self.max_batch_size, 3),
+        }
@@ -0,0 +1,172 @@
+import threading
+from app.model.Detector import Detector
+from app.model.InferenceScheduler import InferenceScheduler
+from app.config.config import BATCH_INFERENCE, BATCH_MAX_SIZE, BATCH_MAX_DELAY
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded detectors keyed by weights path, backend and image size.
+    Services acquire a shared detector instead of loading their own copy of the weights.
+    """
+
+    def __init__(self):
+        self.entries = {}  # key -> {"detector": Detector, "scheduler": InferenceScheduler, "ref_count": int}
+        self.load_locks = {}  # key -> Lock held while that detector loads
+        self.lock = threading.Lock()
+        # Number of services holding a detector, read on every detection so kept outside the lock
+        self.service_count = 0
+        # Count shared with worker processes once a service runs in one, see share_count()
+        self.shared_count = None
+
+    @staticmethod
+    def make_key(model_path, backend, imgsz):
+        return model_path, backend, int(imgsz)
+
+    def load(self, model_path, backend="torch", imgsz=640):
+        """
+        Load and warm up a detector if it is not loaded yet.
+
+        Args:
+            model_path (str): Path to the YOLO weights.
+            backend (str): Inference backend.
+            imgsz (int): Inference image size.
+
+        Returns:
+            Detector: The shared detector.
+        """
+        key = self.make_key(model_path, backend, imgsz)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                return entry["detector"]
+            load_lock = self.load_locks.setdefault(key, threading.Lock())
+
+        # Exporting and warming up can take minutes, only services loading the same key wait for it
+        with load_lock:
+            with self.lock:
+                entry = self.entries.get(key)
+            if entry is None:
+                detector = Detector(model_path, backend, imgsz)
+                detector.warmup()
+                scheduler = InferenceScheduler(detector, BATCH_MAX_SIZE, BATCH_MAX_DELAY) if BATCH_INFERENCE else None
+                entry = {"detector": detector, "scheduler": scheduler, "ref_count": 0}
+                with self.lock:
+                    self.entries[key] = entry
+                print(f"[ModelRegistry] Loaded {model_path} (backend={backend}, imgsz={imgsz})")
+            return entry["detector"]
+
+    def acquire(self, model_path, backend="torch", imgsz=640):
+        """
+        Get a shared detector and take a reference to it.
+
+        Returns:
+            Detector: The shared detector.
+        """
+        detector = self.load(model_path, backend, imgsz)
+        with self.lock:
+            self.entries[self.make_key(model_path, backend, imgsz)]["ref_count"] += 1
+            self.add_services(1)
+        return detector
+
+    def get_scheduler(self, detector):
+        """
+        Get the batching scheduler of a shared detector.
+
+        Args:
+            detector (Detector): The detector returned by acquire().
+
+        Returns:
+            InferenceScheduler or None: The scheduler, or None if batched inference is disabled.
+        """
+        key = self.make_key(detector.model_path, detector.backend, detector.imgsz)
+        with self.lock:
+            return self.entries[key]["scheduler"]
+
+    def release(self, detector):
+        """
+        Drop a reference taken with acquire(). The detector stays loaded for later services.
+
+        Args:
+            detector (Detector): The detector returned by acquire().
+        """
+        key = self.make_key(detector.model_path, detector.backend, detector.imgsz)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry["ref_count"] > 0:
+                entry["ref_count"] -= 1
+                self.add_services(-1)
+
+    def add_services(self, delta):
+        """
+        Change the service count, called with self.lock held.
+        """
+        self.service_count += delta
+        if self.shared_count is not None:
+            with self.shared_count.get_lock():
+                self.shared_count.value += delta
+
+    def share_count(self, context):
+        """
+        Move the service count into shared memory, so services running in worker processes
+        add to the same count and see the services of the whole application.
+
+        Args:
+            context: Multiprocessing context the worker processes are started with.
+
+        Returns:
+            multiprocessing.Value: The shared count, to be handed to use_shared_count() in each worker.
+        """
+        with self.lock:
+            if self.shared_count is None:
+                self.shared_count = context.Value('i', self.service_count)
+            return self.shared_count
+
+    def use_shared_count(self, shared_count):
+        """
+        Count the services of this (worker) process in a count shared by the web process.
+
+        Args:
+            shared_count (multiprocessing.Value): The count returned by share_count().
+        """
+        with self.lock:
+            with shared_count.get_lock():
+                shared_count.value += self.service_count
+            self.shared_count = shared_count
+
+    def active_count(self):
+        """
+        Count the running services holding a detector, including those of worker processes
+        once the count is shared.
+
+        Returns:
+            int: Number of services.
+        """
+        shared_count = self.shared_count
+        return shared_count.value if shared_count is not None else self.service_count
+
+    def get_statistics(self):
+        """
+        Report the loaded detectors.
+
+        Returns:
+            list: Weights path, backend, image size, reference count, weight memory (MB)
+                and batching statistics of each detector.
+        """
+        with self.lock:
+            entries = list(self.entries.items())
+        return [
+            {
+                "model_path": model_path,
+                "backend": backend,
+                "imgsz": imgsz,
+                "ref_count": entry["ref_count"],
+                "memory_mb": round(entry["detector"].memory_bytes() / (1024 * 1024), 2),
+                "batching": entry["scheduler"].get_statistics() if entry["scheduler"] is not None else None,
+            }
+            for (model_path, backend, imgsz), entry in entries
+        ]
+
+
+# Shared by all services of the process
+model_registry = ModelRegistry()
@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap change detector placed in front of the YOLO detector.
+
+    Each frame is reduced to a small blurred grayscale thumbnail of the region of
+    interest and compared with the thumbnail of the last frame that went through the
+    detector. If only a tiny fraction of pixels changed, the detector can be skipped
+    and the previous detections reused. A detection is forced every max_skip frames
+    so slow changes cannot accumulate unnoticed.
+    """
+
+    def __init__(self, pixel_threshold=25, area_threshold=0.002, max_skip=30, width=160):
+        """
+        Initialize the motion gate.
+
+        Args:
+            pixel_threshold (int): Minimum gray level difference for a pixel to count as changed.
+            area_threshold (float): Minimum fraction of changed pixels for the frame to count as changed.
+            max_skip (int): Maximum number of consecutive frames that may skip the detector.
+            width (int): Width of the thumbnail used for the comparison.
+        """
+        self.pixel_threshold = pixel_threshold
+        self.area_threshold = area_threshold
+        self.max_skip = max_skip
+        self.width = width
+        self.reference = None
+        self.consecutive_skips = 0
+        self.frame_count = 0
+        self.skip_count = 0
+
+    def thumbnail(self, frame):
+        """
+        Reduce a frame to a small blurred grayscale image.
+        """
+        height, width = frame.shape[:2]
+        size = (self.width, max(1, round(height * self.width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def should_infer(self, frame):
+        """
+        Decide whether the detector has to run on a frame.
+
+        Args:
+            frame: Region of interest of the current frame.
+
+        Returns:
+            bool: True if the frame changed enough (or a detection is due), False to skip the detector.
+        """
+        self.frame_count += 1
+        thumb = self.thumbnail(frame)
+        if self.reference is not None and self.reference.shape == thumb.shape \
+                and self.consecutive_skips < self.max_skip:
+            diff = cv2.absdiff(thumb, self.reference)
+            changed = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+            if changed < self.area_threshold:
+                self.consecutive_skips += 1
+                self.skip_count += 1
+                return False
+        self.reference = thumb
+        self.consecutive_skips = 0
+        return True
+
+    def get_skip_ratio(self):
+        """
+        Get the fraction of frames that skipped the detector.
+
+        Returns:
+            float: Skipped frames / gated frames.
+        """
+        return self.skip_count / self.frame_count if self.frame_count else 0.0
+
+    def reset(self):
+        """
+        Forget the reference frame and the counters.
+        """
+        self.reference = None
+        self.consecutive_skips = 0
+        self.frame_count = 0
+        self.skip_count = 0
@@ -0,0 +1,103 @@
+import numpy as np
+from collections import deque
+
+
+class ResolutionController:
+    """
+    Per-service controller moving the detector input size along a ladder (e.g. 320/480/640)
+    to keep the p95 detection latency under a target.
+
+    The size steps down as soon as the p95 of a full latency window exceeds the target, and
+    steps up only when the latency expected at the next size (scaled by its pixel count)
+    stays below the target with a safety margin, so the controller does not oscillate.
+    When more services start sharing the machine, the current p95 is scaled by the
+    increase in load so existing services step down right away instead of falling behind.
+    """
+
+    def __init__(self, ladder=(320, 480, 640), target_ms=80.0, imgsz=640, window=30, headroom=0.8):
+        """
+        Initialize the controller.
+
+        Args:
+            ladder (tuple): Allowed input sizes, ascending.
+            target_ms (float): p95 latency target per frame (milliseconds).
+            imgsz (int): Initial input size.
+            window (int): Number of latency samples a decision is based on.
+            headroom (float): Fraction of the target the expected latency must stay under to step up.
+        """
+        self.ladder = sorted(ladder)
+        self.target = target_ms / 1000
+        self.headroom = headroom
+        self.index = max([i for i, size in enumerate(self.ladder) if size <= imgsz] or [0])
+        self.latencies = deque(maxlen=window)
+        self.services = None
+        self.changes = 0
+
+    @property
+    def imgsz(self):
+        """
+        Get the active input size.
+        """
+        return self.ladder[self.index]
+
+    def p95(self):
+        """
+        Get the p95 latency (seconds) of the current window, None until the window is full.
+        """
+        if len(self.latencies) < self.latencies.maxlen:
+            return None
+        return float(np.percentile(self.latencies, 95))
+
+    def step(self, offset):
+        """
+        Move along the ladder and start a new latency window.
+        """
+        self.index += offset
+        self.latencies.clear()
+        self.changes += 1
+
+    def observe(self, seconds, services):
+        """
+        Feed the latency of one detection and adjust the input size.
+
+        Args:
+            seconds (float): Detection latency of a frame.
+            services (int): Number of services currently running.
+
+        Returns:
+            int: The input size to use for the next frame.
+        """
+        previous_services, self.services = self.services, services
+        if previous_services and services > previous_services and self.index > 0:
+            # Latency measured under the old load no longer holds
+            expected = max(self.latencies, default=seconds) * services / previous_services
+            if expected > self.target:
+                self.step(-1)
+                return self.imgsz
+            self.latencies.clear()
+
+        self.latencies.append(seconds)
+        p95 = self.p95()
+        if p95 is None:
+            return self.imgsz
+        if p95 > self.target and self.index > 0:
+            self.step(-1)
+        elif self.index < len(self.ladder) - 1:
+            scale = (self.ladder[self.index + 1] / self.imgsz) ** 2
+            if p95 * scale < self.target * self.headroom:
+                self.step(1)
+        return self.imgsz
+
+    def get_statistics(self):
+        """
+        Report the controller state.
+
+        Returns:
+            dict: Active input size, p95 latency of the current window (ms) and number of size changes.
+        """
+        p95 = self.p95()
+        return {
+            "input_size": self.imgsz,
+            "p95_latency_ms": round(1000 * p95, 2) if p95 is not None else None,
+            "resolution_changes": self.changes,
+        }
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class TrackStore:
+    """
+    Trajectory store backed by preallocated NumPy ring buffers.
+
+    Each track occupies one slot holding its last `history` points as
+    (x, y, bird's-eye x, bird's-eye y). Tracks that have not been seen for
+    `max_age` frames are evicted and their slots recycled, so memory stays
+    flat however many track IDs the tracker hands out over time.
+    """
+
+    def __init__(self, history=30, max_age=90, capacity=64):
+        """
+        Initialize the track store.
+
+        Args:
+            history (int): Number of points kept per track.
+            max_age (int): Number of frames after which an unseen track is evicted.
+            capacity (int): Initial number of slots, doubled when all are in use.
+        """
+        self.history = history
+        self.max_age = max_age
+        self.slots = {}  # track_id -> slot
+        self.points = np.zeros((capacity, history, 4), dtype=np.float32)
+        self.heads = np.zeros(capacity, dtype=np.int32)  # Next write position of each ring
+        self.lengths = np.zeros(capacity, dtype=np.int32)
+        self.last_seen = np.zeros(capacity, dtype=np.int64)  # Frame index of the last update
+        self.free_slots = list(range(capacity - 1, -1, -1))
+
+    def grow(self):
+        """
+        Double the number of slots, keeping the tracks already stored.
+        """
+        capacity = len(self.lengths)
+        self.points = np.concatenate([self.points, np.zeros_like(self.points)])
+        self.heads = np.concatenate([self.heads, np.zeros_like(self.heads)])
+        self.lengths = np.concatenate([self.lengths, np.zeros_like(self.lengths)])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros_like(self.last_seen)])
+        self.free_slots.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def slot_of(self, track_id):
+        """
+        Get the slot of a track, assigning a free one to new tracks.
+        """
+        slot = self.slots.get(track_id)
+        if slot is None:
+            if not self.free_slots:
+                self.grow()
+            slot = self.free_slots.pop()
+            self.heads[slot] = 0
+            self.lengths[slot] = 0
+            self.slots[track_id] = slot
+        return slot
+
+    def update(self, track_ids, points, frame_index):
+        """
+        Append the current point of each track.
+
+        Args:
+            track_ids (list): Track IDs seen in the frame.
+            points (ndarray): Nx4 points (x, y, bird's-eye x, bird's-eye y), one per track ID.
+            frame_index (int): Index of the current frame.
+        """
+        if len(track_ids) == 0:
+            return
+        slots = np.fromiter((self.slot_of(track_id) for track_id in track_ids), dtype=np.int64, count=len(track_ids))
+        self.points[slots, self.heads[slots]] = points
+        self.heads[slots] = (self.heads[slots] + 1) % self.history
+        self.lengths[slots] = np.minimum(self.lengths[slots] + 1, self.history)
+        self.last_seen[slots] = frame_index
+
+    def last(self, track_ids):
+        """
+        Get the latest stored point of each track.
+
+        Args:
+            track_ids (list): Track IDs.
+
+        Returns:
+            tuple: Nx4 points and an N boolean mask of the tracks that have a stored point.
+        """
+        slots = np.fromiter((self.slots.get(track_id, -1) for track_id in track_ids), dtype=np.int64,
+                            count=len(track_ids))
+        known = slots >= 0
+        known[known] = self.lengths[slots[known]] > 0
+        points = np.zeros((len(track_ids), 4), dtype=np.float32)
+        slots = slots[known]
+        points[known] = self.points[slots, (self.heads[slots] - 1) % self.history]
+        return points, known
+
+    def evict(self, frame_index):
+        """
+        Remove tracks that have not been seen for more than max_age frames.
+
+        Args:
+            frame_index (int): Index of the current frame.
+
+        Returns:
+            list: IDs of the evicted tracks.
+        """
+        stale = [track_id for track_id, slot in self.slots.items()
+                 if frame_index - self.last_seen[slot] > self.max_age]
+        for track_id in stale:
+            slot = self.slots.pop(track_id)
+            self.lengths[slot] = 0
+            self.free_slots.append(slot)
+        return stale
+
+    def get(self, track_id):
+        """
+        Get the trajectory of a track, oldest point first.
+
+        Args:
+            track_id (int): Track ID.
+
+        Returns:
+            ndarray: Kx4 points (x, y, bird's-eye x, bird's-eye y), empty if the track is unknown.
+        """
+        slot = self.slots.get(track_id)
+        if slot is None:
+            return np.empty((0, 4), dtype=np.float32)
+        length = self.lengths[slot]
+        order = (self.heads[slot] - length + np.arange(length)) % self.history
+        return self.points[slot, order]
+
+    def clear(self):
+        """
+        Remove all tracks.
+        """
+        self.slots.clear()
+        self.lengths[:] = 0
+        self.free_slots = list(range(len(self.lengths) - 1, -1, -1))
+
+    def __len__(self):
+        return len(self.slots)
@@ -0,0 +1,50 @@
+import torch
+from ultralytics.trackers.track import TRACKER_MAP
+from ultralytics.utils import IterableSimpleNamespace, yaml_load
+from ultralytics.utils.checks import check_yaml
+
+
+class Tracker:
+    """
+    Multi-object tracker owned by a single service, so that detectors can be shared
+    without mixing the track state of different cameras.
+    """
+
+    def __init__(self, tracker_cfg="botsort.yaml", frame_rate=30):
+        """
+        Initialize the tracker.
+
+        Args:
+            tracker_cfg (str): Ultralytics tracker configuration (botsort.yaml or bytetrack.yaml).
+            frame_rate (int): Frame rate of the source, used to size the track buffer.
+        """
+        cfg = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_cfg)))
+        self.tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=frame_rate)
+
+    def update(self, result, frame):
+        """
+        Associate the detections of a frame with existing tracks.
+
+        Args:
+            result (Results): Ultralytics detection result of the frame.
+            frame: The frame the detections belong to.
+
+        Returns:
+            Results: The result restricted to tracked boxes, with track IDs assigned.
+        """
+        det = result.boxes.cpu().numpy()
+        if len(det) == 0:
+            return result
+        tracks = self.tracker.update(det, frame)
+        if len(tracks) == 0:
+            return result
+        idx = tracks[:, -1].astype(int)
+        result = result[idx]
+        result.update(boxes=torch.as_tensor(tracks[:, :-1]))
+        return result
+
+    def reset(self):
+        """
+        Drop all tracks.
+        """
+        self.tracker.reset()
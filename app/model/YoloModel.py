@@ -1,9 +1,17 @@
 import cv2
 import time
+import torch
 import numpy as np
 import cv2
-from ultralytics import YOLO
-from collections import defaultdict
+from collections import defaultdict, deque
+from ultralytics.engine.results import Results
+from app.model.Tracker import Tracker
+from app.model.TrackStore import TrackStore
+from app.model.ZoneMap import ZoneMap
+from app.model.LineCounter import LineCounter
+from app.model.ModelRegistry import model_registry
+from app.util.TimeSeriesStore import TimeSeriesStore
+from app.config.config import TRACK_HISTORY_LENGTH, TRACK_MAX_AGE
 
 
 class YoloModel:
@@ -13,7 +21,17 @@ class YoloModel:
                  stay_threshold: int,
                  traffic_flow: bool,
                  num_lanes: int,
-                 dst_points=np.array([[100, 0], [400, 0], [100, 800], [400, 800]], dtype=np.float32)):
+                 dst_points=np.array([[100, 0], [400, 0], [100, 800], [400, 800]], dtype=np.float32),
+                 backend="torch",
+                 imgsz=640,
+                 roi_crop=False,
+                 roi_mask=False,
+                 roi_margin=32,
+                 motion_gate=None,
+                 adaptive_stride=None,
+                 resolution_controller=None,
+                 zones=None,
+                 lines=None):
         """
         Initialize the YoloModel class.
 
@@ -22,35 +40,91 @@ class YoloModel:
             src_points (ndarray): 4 points for perspective transformation from original to bird's-eye view.
             hot_zone (ndarray, optional): Polygon coordinates for a special zone (e.g., no-parking zone).
             stay_threshold (int): Time (in seconds) after which a vehicle is considered as staying too long in hot zone.
-            traffic_flow (bool): Whether to enable traffic flow counting (crossing middle line).
+            traffic_flow (bool): Whether to enable traffic flow counting. Without lines, vehicles
+                crossing the horizontal middle line of the frame are counted.
             num_lanes (int): Number of lanes to draw in the bird’s-eye view.
             dst_points (ndarray): Destination points for perspective transformation (bird’s-eye view).
+            backend (str): Inference backend of the shared detector.
+            imgsz (int): Inference image size of the shared detector.
+            roi_crop (bool): Run the detector only on the bounding rectangle of src_points (plus roi_margin).
+            roi_mask (bool): With roi_crop, also blank the pixels outside the src_points polygon (plus roi_margin).
+            roi_margin (int): Margin (in pixels) added around the src_points region.
+            motion_gate (MotionGate, optional): Skips the detector on frames where the region did not change.
+            adaptive_stride (AdaptiveStride, optional): Runs the detector every k-th frame and predicts
+                the tracks in between.
+            resolution_controller (ResolutionController, optional): Adjusts the detector input size
+                to a latency target.
+            zones (dict, optional): Named zones (name -> polygon in bird’s-eye coordinates) monitored
+                for long stays in addition to hot_zone.
+            lines (dict, optional): Named count lines, see LineCounter.
         """
-        self.model = YOLO(model_path)
+        # The tracker belongs to this model only, the detector is shared (acquired last, below)
+        self.tracker = Tracker()
+        self.inference_latency = deque(maxlen=100)  # Seconds per detection call, including batching wait
+        self.imgsz = imgsz
+        self.resolution_controller = resolution_controller
+        if resolution_controller is not None:
+            self.imgsz = resolution_controller.imgsz
         self.src_points = src_points
         self.dst_points = dst_points
         self.num_lanes = num_lanes
         self.M = cv2.getPerspectiveTransform(src_points, dst_points)
 
-        # Track history for drawing paths
-        self.track_history = defaultdict(list)
-
-        # Vehicle counting
+        # Region of interest for cropped inference, computed for the first frame size
+        self.roi_crop = roi_crop
+        self.roi_mask = roi_mask
+        self.roi_margin = roi_margin
+        self.roi = None  # (frame shape, (x0, y0, x1, y1), mask or None)
+
+        # Motion gate, reusing the last detections while the scene is static
+        self.motion_gate = motion_gate
+        self.last_detections = None  # Boxes data of the last detector run, in full-frame coordinates
+
+        # Track history for drawing paths, in image and bird’s-eye coordinates
+        self.frame_index = 0
+        # With a stride the tracker only sees every k-th frame, so tracks may stay unseen k times longer
+        self.adaptive_stride = adaptive_stride
+        max_stride = adaptive_stride.max_stride if adaptive_stride is not None else 1
+        self.track_store = TrackStore(TRACK_HISTORY_LENGTH, TRACK_MAX_AGE * max_stride)
+
+        # Vehicle counting. The ID sets only hold tracks still in the track store,
+        # counts are kept separately so they stay exact after tracks are forgotten.
         self.vehicle_count = 0
         self.category_count = defaultdict(int)
         self.seen_track_ids = set()
 
         # Hot zone monitoring
         self.hot_zone = hot_zone
+        zones = dict(zones or {})
+        if hot_zone is not None:
+            zones = {"hot_zone": hot_zone, **zones}
+        self.zone_map = ZoneMap(zones) if zones else None
         self.stay_threshold = stay_threshold
-        self.entry_time = {}
-        self.long_stay_ids = set()
+        self.entry_time = {}  # track_id -> (zone label, entry time)
+        self.long_stay_ids = {}  # track_id -> labels of the zones the track stayed too long in
+        self.long_stay_count = 0
+        self.zone_long_stay_count = defaultdict(int)
+        self.zone_occupancy = {}
 
         # Traffic flow counting
         self.traffic_flow = traffic_flow
-        self.crossed_ids = set()
+        self.line_counter = LineCounter(lines) if lines else None
         self.crossing_count = 0
 
+        # Per-second/minute/hour event counts
+        self.timeline = TimeSeriesStore()
+
+        # Static bird’s-eye layer, rebuilt only when the geometry changes
+        self.birdview_background = None
+        self.birdview_background_key = None
+
+        # The detector is shared through the registry. Taken once everything else is set up, so
+        # invalid zones or lines do not leave a reference and a batching client behind.
+        self.detector = model_registry.acquire(model_path, backend, imgsz)
+        self.scheduler = model_registry.get_scheduler(self.detector)
+        if self.scheduler is not None:
+            self.scheduler.register()
+
     @staticmethod
     def draw_dashed_line(img, start, end, color, thickness, dash_length, gap_length):
         """
@@ -108,37 +182,173 @@ class YoloModel:
             )
             self.draw_dashed_line(birdView_frame, dashed_start, dashed_end, (255, 255, 255), 2, 20, 10)
 
-    def track(self, frame):
+    def get_birdview_background(self):
         """
-        Perform tracking and annotation on a single frame.
+        Get the static layer of the bird’s-eye view (lane lines and zone outlines).
+        The layer is drawn once and cached until dst_points, num_lanes or the zones change.
+
+        Returns:
+            ndarray: The cached background image, must not be drawn on.
+        """
+        key = (
+            np.asarray(self.dst_points).tobytes(),
+            self.num_lanes,
+            None if self.zone_map is None else self.zone_map.key(),
+        )
+        if key != self.birdview_background_key:
+            background = np.zeros((800, 500, 3), dtype=np.uint8)
+            self.draw_lane_lines(background)
+            if self.zone_map is not None:
+                outlines = [np.round(polygon).astype(np.int32).reshape((-1, 1, 2)) for polygon in self.zone_map.polygons]
+                cv2.polylines(background, outlines, isClosed=True, color=(0, 0, 255), thickness=2)
+            self.birdview_background = background
+            self.birdview_background_key = key
+        return self.birdview_background
+
+    def project_points(self, points):
+        """
+        Project image points to bird’s-eye coordinates with a single perspective transform.
+
+        Args:
+            points (ndarray): Nx2 image points.
+
+        Returns:
+            ndarray: Nx2 bird’s-eye points.
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        if len(points) == 0:
+            return np.empty((0, 2), dtype=np.float32)
+        return cv2.perspectiveTransform(points, self.M).reshape(-1, 2)
+
+    def get_roi(self, frame_shape):
+        """
+        Get the inference region of interest for a frame size.
+
+        Args:
+            frame_shape (tuple): Shape of the frame.
+
+        Returns:
+            tuple: ((x0, y0, x1, y1) crop rectangle, mask of the crop or None)
+        """
+        if self.roi is None or self.roi[0] != frame_shape:
+            height, width = frame_shape[:2]
+            hull = cv2.convexHull(np.asarray(self.src_points, dtype=np.float32)).reshape(-1, 2)
+            x, y, w, h = cv2.boundingRect(hull)
+            x0, y0 = max(0, x - self.roi_margin), max(0, y - self.roi_margin)
+            x1, y1 = min(width, x + w + self.roi_margin), min(height, y + h + self.roi_margin)
+            mask = None
+            if self.roi_mask:
+                mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+                cv2.fillPoly(mask, [np.round(hull - (x0, y0)).astype(np.int32)], 255)
+                if self.roi_margin > 0:
+                    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * self.roi_margin + 1,) * 2)
+                    mask = cv2.dilate(mask, kernel)
+            self.roi = (frame_shape, (x0, y0, x1, y1), mask)
+        return self.roi[1], self.roi[2]
+
+    def detect(self, frame):
+        """
+        Run the shared detector on a frame, restricted to the region of interest if enabled.
+        If the motion gate finds the region unchanged, the detections of the last detector
+        run are reused so the tracker keeps seeing the same (static) objects.
 
         Args:
             frame: Input video frame.
 
         Returns:
-            annotated_frame: Frame with visual annotations.
-            frame: Original frame (unchanged).
-            birdView_frame: Bird’s-eye view frame with trajectory and lanes.
+            Results: Detection result in full-frame coordinates.
+        """
+        (x0, y0, x1, y1), mask = self.get_roi(frame.shape)
+        if self.motion_gate is not None and not self.motion_gate.should_infer(frame[y0:y1, x0:x1]) \
+                and self.last_detections is not None:
+            return Results(frame, path="", names=self.detector.names, boxes=self.last_detections)
+
+        inference_frame = frame
+        if self.roi_crop:
+            inference_frame = frame[y0:y1, x0:x1]
+            if mask is not None:
+                inference_frame = cv2.bitwise_and(inference_frame, inference_frame, mask=mask)
+
+        start_time = time.perf_counter()
+        if self.scheduler is not None:
+            result = self.scheduler.predict(inference_frame, self.imgsz)
+        else:
+            result = self.detector.predict(inference_frame, self.imgsz)
+        latency = time.perf_counter() - start_time
+        self.inference_latency.append(latency)
+        if self.resolution_controller is not None:
+            self.imgsz = self.resolution_controller.observe(latency, model_registry.active_count())
+
+        if inference_frame is not frame:
+            # Map the boxes back to full-frame coordinates
+            data = result.boxes.data.clone()
+            data[:, :4] += torch.tensor([x0, y0, x0, y0], dtype=data.dtype, device=data.device)
+            result = Results(frame, path=result.path, names=result.names, boxes=data)
+        self.last_detections = result.boxes.data
+        return result
+
+    def infer(self, frame, timestamp=None):
+        """
+        Run detection and tracking on a single frame and update trajectories and statistics.
+
+        Args:
+            frame: Input video frame.
+            timestamp (float, optional): Time of the frame in seconds, used for stay times and
+                events. Defaults to the current time; offline analysis passes the video time.
+
+        Returns:
+            dict: Per-frame tracking result consumed by render():
+                result: Ultralytics detection result of the frame.
+                boxes: Box centers and sizes (xywh) of the tracked objects.
+                track_ids: Track ID of each box.
+                trajectories: Snapshot of the trajectory of each tracked object, as Kx4 points
+                    (x, y, bird’s-eye x, bird’s-eye y).
+                events: New vehicles, long stays and crossings of the frame.
         """
-        results = self.model.track(frame, persist=True, show=False, verbose=False)
+        self.frame_index += 1
+        if self.adaptive_stride is None:
+            result = self.tracker.update(self.detect(frame), frame)
+        elif self.adaptive_stride.should_detect():
+            start_time = time.perf_counter()
+            result = self.tracker.update(self.detect(frame), frame)
+            self.adaptive_stride.observe_latency(time.perf_counter() - start_time)
+            self.adaptive_stride.update(result, self.frame_index)
+        else:
+            result = self.adaptive_stride.predict(frame, self.frame_index, self.detector.names)
 
-        boxes = results[0].boxes.xywh.cpu()
+        boxes = result.boxes.xywh.cpu()
         
         # 处理跟踪ID可能为None的情况
-        if results[0].boxes.id is not None:
-            track_ids = results[0].boxes.id.int().cpu().tolist()
+        if result.boxes.id is not None:
+            track_ids = result.boxes.id.int().cpu().tolist()
         else:
             # 如果没有跟踪ID，生成临时ID
             track_ids = list(range(len(boxes)))
             
-        cls_indices = results[0].boxes.cls.int().cpu().tolist()
-        class_names = self.model.names
-
-        annotated_frame = results[0].plot()
-        birdView_frame = np.zeros((800, 500, 3), dtype=np.uint8)
-        self.draw_lane_lines(birdView_frame)
+        cls_indices = result.boxes.cls.int().cpu().tolist()
+        class_names = self.detector.names
+
+        # Only the new centers are projected, the projected history is kept per track
+        centers = boxes[:, :2].numpy()
+        birdview_centers = self.project_points(centers)
+        points = np.hstack([centers, birdview_centers])
+        prev_points, has_prev = self.track_store.last(track_ids)
+        self.track_store.update(track_ids, points, self.frame_index)
+        self.forget_tracks(self.track_store.evict(self.frame_index))
+        trajectories = {track_id: self.track_store.get(track_id) for track_id in track_ids}
+
+        # Zone membership of all tracks with one mask lookup, dwell times from one timestamp
+        now = time.time() if timestamp is None else timestamp
+        if self.zone_map is not None:
+            zone_labels = self.zone_map.lookup(birdview_centers)
+            counts = np.bincount(zone_labels, minlength=len(self.zone_map.names) + 1)
+            self.zone_occupancy = {name: int(count) for name, count in zip(self.zone_map.names, counts[1:])}
+        else:
+            zone_labels = np.zeros(len(track_ids), dtype=np.uint8)
 
-        for box, track_id, cls_idx in zip(boxes, track_ids, cls_indices):
+        events = []  # Discrete events of the frame, pushed to event subscribers
+        series_counts = defaultdict(int)  # Series name -> count, added to the timeline once per frame
+        for zone_label, track_id, cls_idx in zip(zone_labels, track_ids, cls_indices):
             class_name = class_names[cls_idx]
 
             # Count new vehicle appearances
@@ -146,73 +356,170 @@ class YoloModel:
                 self.seen_track_ids.add(track_id)
                 self.vehicle_count += 1
                 self.category_count[class_name] += 1
+                series_counts[f"vehicle:{class_name}"] += 1
+                events.append({"type": "vehicle", "time": now, "track_id": track_id, "class": class_name})
+
+            # Hot zone logic (for detecting long stay)
+            if zone_label:
+                zone_label = int(zone_label)
+                entry = self.entry_time.get(track_id)
+                if entry is None or entry[0] != zone_label:
+                    self.entry_time[track_id] = (zone_label, now)
+                elif now - entry[1] > self.stay_threshold:
+                    stayed = self.long_stay_ids.setdefault(track_id, set())
+                    if zone_label not in stayed:
+                        stayed.add(zone_label)
+                        self.long_stay_count += 1
+                        zone_name = self.zone_map.name_of(zone_label)
+                        self.zone_long_stay_count[zone_name] += 1
+                        series_counts[f"long_stay:{zone_name}"] += 1
+                        events.append({"type": "long_stay", "time": now, "track_id": track_id, "zone": zone_name})
+            elif track_id in self.entry_time:
+                del self.entry_time[track_id]
+
+        # Traffic flow logic (all steps against all count lines at once)
+        if self.traffic_flow and self.line_counter is None:
+            middle_line_y = frame.shape[0] // 2
+            self.line_counter = LineCounter({
+                "middle": {"points": ((0, middle_line_y), (frame.shape[1], middle_line_y)), "space": "image"}
+            })
+        if self.line_counter is not None and has_prev.any():
+            steps = np.flatnonzero(has_prev)
+            crossings = self.line_counter.update(
+                [track_ids[i] for i in steps], prev_points[steps], points[steps],
+                [class_names[cls_indices[i]] for i in steps],
+            )
+            self.crossing_count += len(crossings)
+            for track_id, line, direction, class_name in crossings:
+                series_counts[f"crossing:{class_name}"] += 1
+                series_counts[f"line:{line}:{direction}"] += 1
+                events.append({"type": "crossing", "time": now, "track_id": track_id, "line": line,
+                               "direction": direction, "class": class_name})
+        self.timeline.add(series_counts, now)
+
+        return {
+            "result": result,
+            "boxes": boxes,
+            "track_ids": track_ids,
+            "trajectories": trajectories,
+            "events": events,
+        }
+
+    def render(self, frame, tracking, annotated=True, birdview=True):
+        """
+        Draw the annotated frame and the bird’s-eye view of a tracking result.
 
-            x, y, w, h = box
-            track = self.track_history[track_id]
-            track.append((float(x), float(y)))
-            if len(track) > 30:
-                track.pop(0)
+        Args:
+            frame: Input video frame the tracking result belongs to.
+            tracking (dict): Result of infer() for the frame.
+            annotated (bool): Whether to draw the annotated frame.
+            birdview (bool): Whether to draw the bird’s-eye view.
+
+        Returns:
+            annotated_frame: Frame with visual annotations, None if not requested.
+            birdView_frame: Bird’s-eye view frame with trajectory and lanes, None if not requested.
+        """
+        annotated_frame = tracking["result"].plot() if annotated else None
+        # The frame is handed to consumers by reference, so each frame gets its own copy of the layer
+        birdView_frame = self.get_birdview_background().copy() if birdview else None
+
+        for track_id in tracking["track_ids"]:
+            track = tracking["trajectories"][track_id]
 
             # Draw trajectory on original frame
-            points = np.hstack(track).astype(np.int32).reshape((-1, 1, 2))
-            cv2.polylines(annotated_frame, [points], isClosed=False, color=(230, 230, 230), thickness=10)
+            if annotated:
+                points = track[:, :2].astype(np.int32).reshape((-1, 1, 2))
+                cv2.polylines(annotated_frame, [points], isClosed=False, color=(230, 230, 230), thickness=10)
+
+            if not birdview:
+                continue
 
             # Draw trajectory on bird’s-eye view
-            for point in track:
-                src_point = np.array([[[point[0], point[1]]]], dtype=np.float32)
-                dst_point = cv2.perspectiveTransform(src_point, self.M)
-                bx, by = dst_point[0][0]
+            for bx, by in track[:, 2:]:
                 cv2.circle(birdView_frame, (int(bx), int(by)), 5, (0, 255, 0), -1)
 
-            # Hot zone logic (for detecting long stay)
-            if self.hot_zone is not None:
-                dst_point = cv2.perspectiveTransform(np.array([[[x, y]]], dtype=np.float32), self.M)
-                bx, by = dst_point[0][0]
-                if cv2.pointPolygonTest(self.hot_zone, (int(bx), int(by)), False) >= 0:
-                    if track_id not in self.entry_time:
-                        self.entry_time[track_id] = time.time()
-                    elif time.time() - self.entry_time[track_id] > self.stay_threshold:
-                        self.long_stay_ids.add(track_id)
-                elif track_id in self.entry_time:
-                    del self.entry_time[track_id]
-
-            # Traffic flow logic (count vehicles crossing middle line)
-            if self.traffic_flow:
-                center_y = y
-                prev_positions = self.track_history[track_id][-2:] if len(self.track_history[track_id]) >= 2 else []
-                frame_height = frame.shape[0]
-                middle_line_y = frame_height // 2
-
-                if len(prev_positions) == 2:
-                    prev_y = prev_positions[0][1]
-                    curr_y = center_y
-                    if (prev_y < middle_line_y <= curr_y) or (prev_y > middle_line_y >= curr_y):
-                        if track_id not in self.crossed_ids:
-                            self.crossed_ids.add(track_id)
-                            self.crossing_count += 1
-
             # Label the ID in bird’s-eye view
-            if track:
-                src_point = np.array([[[track[-1][0], track[-1][1]]]], dtype=np.float32)
-                dst_point = cv2.perspectiveTransform(src_point, self.M)
-                bx, by = dst_point[0][0]
+            if len(track):
+                bx, by = track[-1, 2:]
                 cv2.putText(birdView_frame, f"ID:{track_id}", (int(bx), int(by) - 10),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
 
+        return annotated_frame, birdView_frame
+
+    def track(self, frame):
+        """
+        Perform tracking and annotation on a single frame.
+
+        Args:
+            frame: Input video frame.
+
+        Returns:
+            annotated_frame: Frame with visual annotations.
+            frame: Original frame (unchanged).
+            birdView_frame: Bird’s-eye view frame with trajectory and lanes.
+        """
+        tracking = self.infer(frame)
+        annotated_frame, birdView_frame = self.render(frame, tracking)
         return annotated_frame, frame, birdView_frame
 
+    def forget_tracks(self, track_ids):
+        """
+        Drop membership entries of tracks evicted from the track store.
+        Evicted tracks have been lost for longer than the tracker keeps lost tracks,
+        so their IDs cannot come back and the counts they contributed stay unchanged.
+
+        Args:
+            track_ids (list): IDs of the evicted tracks.
+        """
+        for track_id in track_ids:
+            self.seen_track_ids.discard(track_id)
+            self.long_stay_ids.pop(track_id, None)
+            self.entry_time.pop(track_id, None)
+        if self.line_counter is not None:
+            self.line_counter.forget(track_ids)
+
+    def get_counters(self):
+        """
+        Get the event counters, the part of the statistics that only changes with events.
+
+        Returns:
+            dict: Total vehicles, category counts, long stays and crossings.
+        """
+        return {
+            "total_count": self.vehicle_count,
+            "category_count": dict(self.category_count),
+            "long_stay_count": self.long_stay_count,
+            "zone_long_stay_count": dict(self.zone_long_stay_count),
+            "crossing_count": self.crossing_count,
+            "line_counts": self.line_counter.get_counts() if self.line_counter is not None else {},
+        }
+
     def get_statistics(self):
         """
         Get current statistics.
 
         Returns:
-            dict: Total vehicles, category counts, long stays, and flow crossing count.
+            dict: Total vehicles, category counts, long stays (in total and per zone), current zone
+                occupancy, flow crossing count (in total and per line, direction and class),
+                mean inference latency (ms), the batch fill ratio of the shared detector
+                the fraction of frames that skipped the detector, the adaptive stride statistics
+                and the active detector input size.
         """
+        latencies = list(self.inference_latency)
         return {
             "total_count": self.vehicle_count,
             "category_count": self.category_count,
-            "long_stay_count": len(self.long_stay_ids),
+            "long_stay_count": self.long_stay_count,
+            "zone_long_stay_count": dict(self.zone_long_stay_count),
+            "zone_occupancy": self.zone_occupancy,
             "crossing_count": self.crossing_count,
+            "line_counts": self.line_counter.get_counts() if self.line_counter is not None else {},
+            "inference_latency_ms": round(1000 * sum(latencies) / len(latencies), 2) if latencies else None,
+            "batch_fill_ratio": self.scheduler.get_statistics()["batch_fill_ratio"] if self.scheduler is not None else None,
+            "motion_skip_ratio": round(self.motion_gate.get_skip_ratio(), 3) if self.motion_gate is not None else None,
+            "inference_stride": self.adaptive_stride.get_statistics() if self.adaptive_stride is not None else None,
+            "input_size": self.imgsz,
+            "resolution": self.resolution_controller.get_statistics() if self.resolution_controller is not None else None,
         }
 
     def reset_statistics(self):
@@ -223,6 +530,29 @@ class YoloModel:
         self.category_count = defaultdict(int)
         self.seen_track_ids = set()
         self.entry_time.clear()
-        self.long_stay_ids = set()
+        self.long_stay_ids = {}
+        self.long_stay_count = 0
+        self.zone_long_stay_count = defaultdict(int)
+        self.zone_occupancy = {}
         self.crossing_count = 0
-        self.crossed_ids.clear()
+        if self.line_counter is not None:
+            self.line_counter.reset()
+        self.timeline.clear()
+
+    def release(self):
+        """
+        Reset statistics and tracks and give the shared detector back to the registry.
+        """
+        self.reset_statistics()
+        self.tracker.reset()
+        self.track_store.clear()
+        self.last_detections = None
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        if self.adaptive_stride is not None:
+            self.adaptive_stride.reset()
+        if self.detector is not None:
+            if self.scheduler is not None:
+                self.scheduler.unregister()
+            model_registry.release(self.detector)
+            self.detector = None
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+
+class ZoneMap:
+    """
+    Named zones rasterized once into a label mask in bird's-eye coordinates.
+
+    Label 0 means "no zone", zone i (in insertion order) has label i + 1. Zone membership
+    of any number of points is then a single indexed lookup into the mask, whatever the
+    number or shape of the zones. Zones are expected not to overlap; where they do, the
+    zone added last wins.
+    """
+
+    def __init__(self, zones, shape=(800, 500)):
+        """
+        Rasterize the zones.
+
+        Args:
+            zones (dict): Zone name -> polygon (Nx2 bird's-eye coordinates).
+            shape (tuple): (height, width) of the bird's-eye view.
+        """
+        if len(zones) > 255:
+            raise ValueError("At most 255 zones are supported")
+        self.names = list(zones)
+        self.polygons = [np.asarray(polygon, dtype=np.float32).reshape(-1, 2) for polygon in zones.values()]
+        self.mask = np.zeros(shape, dtype=np.uint8)
+        for label, polygon in enumerate(self.polygons, start=1):
+            cv2.fillPoly(self.mask, [np.round(polygon).astype(np.int32)], label)
+
+    def lookup(self, points):
+        """
+        Get the zone label of each point.
+
+        Args:
+            points (ndarray): Nx2 bird's-eye points.
+
+        Returns:
+            ndarray: N labels, 0 for points outside every zone (or outside the view).
+        """
+        points = np.asarray(points).reshape(-1, 2)
+        labels = np.zeros(len(points), dtype=np.uint8)
+        if len(points) == 0:
+            return labels
+        xs, ys = points[:, 0].astype(np.int64), points[:, 1].astype(np.int64)
+        height, width = self.mask.shape
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        labels[inside] = self.mask[ys[inside], xs[inside]]
+        return labels
+
+    def name_of(self, label):
+        """
+        Get the name of a zone label.
+        """
+        return self.names[label - 1]
+
+    def key(self):
+        """
+        Get a value that changes whenever the zone geometry changes.
+        """
+        return tuple((name, polygon.tobytes()) for name, polygon in zip(self.names, self.polygons))
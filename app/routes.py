@@ -1,10 +1,18 @@
 import os
 import cv2
+import json
 import threading
 import numpy as np
 from functools import wraps
 from app.util.Camera import Camera
 from app.service.YoloService import YoloService
+from app.service.BatchJob import BatchJob
+from app.service.ServiceProcess import ServiceProcess
+from app.model.ModelRegistry import model_registry
+from app.util.PreviewCache import preview_cache
+from app.config.config import FRAME_POLICY, MODEL_PATH, MODEL_BACKEND, MODEL_IMGSZ, ROI_CROP, ROI_MASK, \
+    MOTION_GATE, ADAPTIVE_STRIDE, LATENCY_TARGET_MS, EVENT_KEEPALIVE, SERVICE_MODE, \
+    FILE_FRAME_STRIDE
 from flask import request, Blueprint, jsonify, Response
 from flask import render_template
 
@@ -30,6 +38,9 @@ api_bp = Blueprint('api', __name__)
 # Store multiple YoloService instances
 yolo_services = {}
 
+# Offline analysis jobs by job ID
+batch_jobs = {}
+
 # Service ID management
 current_service_id = 0
 id_lock = threading.Lock()
@@ -55,6 +66,78 @@ def send_frame_response(frame):
     return Response(frame, mimetype='image/jpeg')
 
 
+# Utility: send the cached JPEG of a view, answering 304 if the client already has it
+def send_cached_frame_response(service, view):
+    cache = service.get_frame_cache(view)
+    generation, jpeg = cache.get_jpeg()
+    if jpeg is None:
+        return jsonify({"error": "No frame available"}), 400
+
+    etag = cache.etag(generation)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(jpeg, mimetype='image/jpeg')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Frame-Generation'] = str(generation)
+    return response
+
+
+# Utility: stream frames of a view as multipart/x-mixed-replace (MJPEG)
+def stream_frame_response(service, view):
+    cache = service.get_frame_cache(view)
+
+    def generate():
+        # Ask the service to render this view until the first frame arrives
+        cache.touch()
+        frame_id = 0
+        while True:
+            frame_id = service.wait_for_frame(frame_id)
+            if frame_id is None:
+                break
+            _, jpeg = cache.get_jpeg()
+            if jpeg is None:
+                continue
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n'
+                   b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n\r\n' +
+                   jpeg + b'\r\n')
+
+    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+
+# Helper function to stream statistics deltas and events of a service (Server-Sent Events)
+def stream_events_response(service):
+    # Subscribe before taking the snapshot so no change falls in between
+    subscriber = service.event_hub.subscribe()
+    snapshot = service.get_statistics()
+
+    def message(event, data):
+        return f"event: {event}\ndata: {json.dumps(data, default=float)}\n\n"
+
+    def generate():
+        try:
+            yield message("stats", snapshot)
+            while True:
+                pending = subscriber.get(EVENT_KEEPALIVE)
+                if pending is None:
+                    break
+                stats, events = pending
+                if not stats and not events:
+                    yield ": keepalive\n\n"
+                    continue
+                if stats:
+                    yield message("stats", stats)
+                for event in events:
+                    yield message(event["type"], event)
+        finally:
+            service.event_hub.unsubscribe(subscriber)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 # Route: Get list of video files in the ./videos directory
 @api_bp.route('/fileList', methods=['GET'])
 def fileList():
@@ -68,24 +151,44 @@ def fileList():
         return jsonify({"error": f"Failed to read video files: {str(e)}"}), 500
 
 
+# Helper function to find the running service that owns a capture source
+def find_service_by_source(cap_type, cap_path):
+    for service_info in list(yolo_services.values()):
+        service = service_info['service']
+        if getattr(service, 'source', None) == (cap_type, str(cap_path)):
+            return service
+    return None
+
+
 # Route: Capture and return a single frame from camera or video
 @api_bp.route('/getOneFrame', methods=['POST'])
 def get_one_frame():
     cap_type = request.json.get('cap_type')
     cap_path = request.json.get('cap_path')
-    cap = Camera()
-    cap.setCap(cap_type, cap_path)
 
-    ret, frame = cap.getCap().read()
-    cap.getCap().release()
+    # A source a running service already owns is not opened a second time
+    service = find_service_by_source(cap_type, cap_path)
+    if service is not None:
+        _, jpeg = service.get_frame_cache("row").get_jpeg()
+        if jpeg is not None:
+            return send_frame_response(jpeg)
 
-    if not ret:
-        return jsonify({"error": "Failed to capture frame"}), 500
+    def load():
+        cap = Camera()
+        cap.setCap(cap_type, cap_path)
+        ret, frame = cap.getCap().read()
+        cap.getCap().release()
+        if not ret:
+            raise ValueError("Failed to capture frame")
+        ret, jpeg = cv2.imencode('.jpg', frame)
+        if not ret:
+            raise ValueError("Failed to encode frame")
+        return jpeg.tobytes()
 
-    ret, jpeg = cv2.imencode('.jpg', frame)
-    if not ret:
-        return jsonify({"error": "Failed to encode frame"}), 500
-    frame_bytes = jpeg.tobytes()
+    try:
+        frame_bytes = preview_cache.get(cap_type, cap_path, load)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
     return send_frame_response(frame_bytes)
 
@@ -97,35 +200,80 @@ def start_service():
     src_points = request.json.get('src_points')
     cap_type = request.json.get('cap_type')
     cap_path = request.json.get('cap_path')
+    frame_policy = request.json.get('frame_policy', FRAME_POLICY.get(cap_type, "latest"))
+    backend = request.json.get('backend', MODEL_BACKEND)
+    roi_crop = request.json.get('roi_crop', ROI_CROP)
+    roi_mask = request.json.get('roi_mask', ROI_MASK)
+    motion_gate = request.json.get('motion_gate', MOTION_GATE)
+    adaptive_stride = request.json.get('adaptive_stride', ADAPTIVE_STRIDE)
+    latency_target_ms = request.json.get('latency_target_ms', LATENCY_TARGET_MS)
+    # Named zones in bird's-eye coordinates: {"name": [{"x": .., "y": ..}, ...]}
+    zones = {
+        name: np.array([[point['x'], point['y']] for point in polygon], dtype=np.float32)
+        for name, polygon in (request.json.get('zones') or {}).items()
+    }
+    # Named count lines: {"name": {"points": [{"x": .., "y": ..}, {"x": .., "y": ..}], "space": "image"}}
+    lines = {
+        name: {
+            "points": [[point['x'], point['y']] for point in line['points']],
+            "space": line.get('space', 'image'),
+        }
+        for name, line in (request.json.get('lines') or {}).items()
+    }
+
+    execution = request.json.get('execution', SERVICE_MODE)
+    frame_stride = request.json.get('frame_stride', FILE_FRAME_STRIDE)
+    options = dict(
+        frame_policy=frame_policy,
+        backend=backend,
+        imgsz=MODEL_IMGSZ,
+        roi_crop=roi_crop,
+        roi_mask=roi_mask,
+        motion_gate=motion_gate,
+        adaptive_stride=adaptive_stride,
+        latency_target_ms=latency_target_ms,
+        zones=zones,
+        lines=lines
+    )
 
     global current_service_id
 
     try:
-        cap = Camera()
-        cap.setCap(cap_type, cap_path)
-        if not cap.getCap().isOpened():
-            error_msg = f"Failed to open camera. Type: {cap_type}, Path: {cap_path}"
-            print(f"[ERROR] {error_msg}")
-            return jsonify({"error": error_msg}), 400
+        model_path = MODEL_PATH
+        src_points = np.array([[point['x'], point['y']] for point in src_points], dtype=np.float32)
+
+        if execution == "process":
+            if not os.path.exists(model_path):
+                return jsonify({"error": "Model not found"}), 400
+            # The worker process opens the source itself and reports failures back
+            try:
+                service = ServiceProcess(cap_type, cap_path, model_path, src_points, frame_stride, **options)
+            except RuntimeError as e:
+                print(f"[ERROR] {e}")
+                return jsonify({"error": str(e)}), 400
+        else:
+            cap = Camera()
+            cap.setCap(cap_type, cap_path, frame_stride)
+            if not cap.getCap().isOpened():
+                error_msg = f"Failed to open camera. Type: {cap_type}, Path: {cap_path}"
+                print(f"[ERROR] {error_msg}")
+                return jsonify({"error": error_msg}), 400
+
+            if not os.path.exists(model_path):
+                return jsonify({"error": "Model not found"}), 400
+
+            # Initialize YoloService with source points
+            service = YoloService(model_path, src_points, cap.getCap(), **options)
+            # Keep reference to cap to prevent garbage collection
+            service.camera_ref = cap
 
-        model_path = f"yolov10n.pt"
-        if not os.path.exists(model_path):
-            return jsonify({"error": "Model not found"}), 400
+        # Lets previews of this source use the service's frames
+        service.source = (cap_type, str(cap_path))
 
         with id_lock:
             current_service_id += 1
             service_id = current_service_id
 
-            # Initialize YoloService with source points
-            # Keep reference to cap to prevent garbage collection
-            service = YoloService(
-                model_path,
-                np.array([[point['x'], point['y']] for point in src_points], dtype=np.float32),
-                cap.getCap()
-            )
-            # Store camera reference in service to prevent release
-            service.camera_ref = cap
-
             # Start service in a background thread
             t = threading.Thread(target=service.start)
             t.daemon = True  # Set as daemon thread to allow app to exit without waiting for service to stop
@@ -143,21 +291,42 @@ def start_service():
 @api_bp.route('/getRowFrame/<int:service_id>', methods=['GET'])
 @with_service
 def get_row_frame(service):
-    return send_frame_response(service.get_row_frame())
+    return send_cached_frame_response(service, "row")
 
 
 # Route: Get processed detection frame from a running service
 @api_bp.route('/getProcessedFrame/<int:service_id>', methods=['GET'])
 @with_service
 def get_processed_frame(service):
-    return send_frame_response(service.get_processed_frame())
+    return send_cached_frame_response(service, "processed")
 
 
 # Route: Get bird's-eye view frame from a running service
 @api_bp.route('/getBirdViewFrame/<int:service_id>', methods=['GET'])
 @with_service
 def get_bird_view_frame(service):
-    return send_frame_response(service.get_birdView_frame())
+    return send_cached_frame_response(service, "birdview")
+
+
+# Route: Stream raw frames of a running service (MJPEG)
+@api_bp.route('/streamRowFrame/<int:service_id>', methods=['GET'])
+@with_service
+def stream_row_frame(service):
+    return stream_frame_response(service, "row")
+
+
+# Route: Stream processed detection frames of a running service (MJPEG)
+@api_bp.route('/streamProcessedFrame/<int:service_id>', methods=['GET'])
+@with_service
+def stream_processed_frame(service):
+    return stream_frame_response(service, "processed")
+
+
+# Route: Stream bird's-eye view frames of a running service (MJPEG)
+@api_bp.route('/streamBirdViewFrame/<int:service_id>', methods=['GET'])
+@with_service
+def stream_bird_view_frame(service):
+    return stream_frame_response(service, "birdview")
 
 
 # Route: Stop and release a YoloService instance
@@ -180,6 +349,81 @@ def get_statistics(service):
     return jsonify({"statistics": service.get_statistics()}), 200
 
 
+# Route: Push statistics deltas and events (vehicle, crossing, long_stay) of a service (Server-Sent Events)
+@api_bp.route('/streamEvents/<int:service_id>', methods=['GET'])
+@with_service
+def stream_events(service):
+    return stream_events_response(service)
+
+
+# Route: Get event counts of a service over a time range at a chosen resolution
+@api_bp.route('/getStatisticsRange/<int:service_id>', methods=['POST'])
+@with_service
+def get_statistics_range(service):
+    params = request.get_json(silent=True) or {}
+    try:
+        timeline = service.get_statistics_range(
+            params.get('resolution', 'minute'), params.get('start'), params.get('end')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"timeline": timeline}), 200
+
+
+# Route: Start an offline analysis job over video files in the ./videos directory
+@api_bp.route('/batchJob', methods=['POST'])
+def start_batch_job():
+    params = request.get_json(silent=True) or {}
+    files = params.get('files') or []
+    src_points = params.get('src_points')
+    if not files or not src_points:
+        return jsonify({"error": "files and src_points are required"}), 400
+    paths = [os.path.join("./videos", os.path.basename(name)) for name in files]
+    missing = [name for name, path in zip(files, paths) if not os.path.isfile(path)]
+    if missing:
+        return jsonify({"error": f"Video files not found: {missing}"}), 400
+
+    job = BatchJob(
+        paths,
+        [[point['x'], point['y']] for point in src_points],
+        segment_seconds=params.get('segment_seconds'),
+        workers=params.get('workers'),
+        traffic_flow=params.get('traffic_flow', False),
+        backend=params.get('backend', MODEL_BACKEND),
+        zones={name: [[point['x'], point['y']] for point in polygon]
+               for name, polygon in (params.get('zones') or {}).items()},
+        lines={name: {"points": [[point['x'], point['y']] for point in line['points']],
+                      "space": line.get('space', 'image')}
+               for name, line in (params.get('lines') or {}).items()},
+        frame_stride=params.get('frame_stride', 1),
+        decode_width=params.get('decode_width'),
+    )
+    batch_jobs[job.job_id] = job
+    job.start()
+    return jsonify({"job_id": job.job_id}), 200
+
+
+# Route: Get progress, ETA and (once done) the summary of an offline analysis job
+@api_bp.route('/batchJob/<job_id>', methods=['GET'])
+def get_batch_job(job_id):
+    job = batch_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"job": job.get_status()}), 200
+
+
+# Route: List offline analysis jobs
+@api_bp.route('/batchJobs', methods=['GET'])
+def list_batch_jobs():
+    return jsonify({"jobs": [job.get_status() for job in batch_jobs.values()]}), 200
+
+
+# Route: Get loaded models with their reference counts and memory usage
+@api_bp.route('/modelStats', methods=['GET'])
+def get_model_stats():
+    return jsonify({"models": model_registry.get_statistics()}), 200
+
+
 # Route: Serve the main HTML page
 @api_bp.route('/')
 def api_index():
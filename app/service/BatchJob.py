@@ -0,0 +1,336 @@
+import os
+import cv2
+import json
+import math
+import time
+import uuid
+import argparse
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from app.util.FileCapture import FileCapture
+from app.config.config import MODEL_PATH, MODEL_BACKEND, MODEL_IMGSZ, BATCH_JOB_WORKERS, BATCH_JOB_OUTPUT, \
+    BATCH_JOB_PROGRESS_INTERVAL
+
+
+def merge_counters(total, counters):
+    """
+    Add the counters of one segment to the running totals (nested dicts of counts).
+    """
+    for key, value in counters.items():
+        if isinstance(value, dict):
+            merge_counters(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def analyze_segment(task, progress):
+    """
+    Worker process: track the frames of one video segment and write one JSONL record per frame.
+
+    Args:
+        task (dict): Video path, frame range, output path and YoloModel options of the segment.
+        progress (multiprocessing.Queue): Receives (task index, frames done since the last report).
+
+    Returns:
+        dict: Task index, number of frames processed and the event counters of the segment.
+    """
+    # Imported here so the parent process does not need the detector stack to plan jobs
+    import torch
+    from app.model.YoloModel import YoloModel
+
+    # Every worker decodes and infers on its own, so keep each one to its share of the cores
+    torch.set_num_threads(task["threads"])
+    cv2.setNumThreads(task["threads"])
+
+    cap = FileCapture(task["video_path"], width=task["decode_width"], stride=task["frame_stride"],
+                      threads=task["threads"])
+    if task["start_frame"]:
+        cap.seek(task["start_frame"])
+    model = YoloModel(task["model_path"], np.array(task["src_points"], dtype=np.float32), None,
+                      task["stay_threshold"], task["traffic_flow"], task["num_lanes"],
+                      backend=task["backend"], imgsz=task["imgsz"],
+                      zones={name: np.array(polygon, dtype=np.float32) for name, polygon in task["zones"].items()},
+                      lines=task["lines"])
+    frames, reported = 0, 0
+    try:
+        with open(task["output_path"], "w") as output:
+            while cap.position < task["end_frame"]:
+                index = cap.position
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                timestamp = index / task["fps"]
+                tracking = model.infer(frame, timestamp)
+                boxes = tracking["result"].boxes
+                output.write(json.dumps({
+                    "frame": index,
+                    "time": round(timestamp, 3),
+                    "segment": task["segment"],
+                    "track_ids": tracking["track_ids"],
+                    "classes": [model.detector.names[c] for c in boxes.cls.int().cpu().tolist()],
+                    "confidences": [round(c, 4) for c in boxes.conf.cpu().tolist()],
+                    "boxes": np.round(boxes.xyxy.cpu().numpy(), 1).tolist(),
+                    "events": tracking["events"],
+                }, default=float) + "\n")
+                frames += 1
+                if frames - reported >= BATCH_JOB_PROGRESS_INTERVAL:
+                    progress.put((task["index"], frames - reported))
+                    reported = frames
+        progress.put((task["index"], frames - reported))
+        return {"index": task["index"], "frames": frames, "counters": model.get_counters()}
+    finally:
+        model.release()
+        cap.release()
+
+
+class BatchJob:
+    """
+    Offline analysis of one or more video files.
+
+    Files, or fixed-length segments of them, are spread across a pool of worker processes
+    that decode and track as fast as they can, without rendering or pacing. Each worker
+    writes per-frame detections, tracks and events to a JSONL part; parts are merged into
+    one <file>.jsonl per video and the event counters into summary.json.
+
+    Segments of one file are tracked independently: track IDs restart in every segment
+    (records carry the segment number) and a vehicle seen on both sides of a boundary is
+    counted in both.
+    """
+
+    def __init__(self, files, src_points, model_path=MODEL_PATH, segment_seconds=None, workers=BATCH_JOB_WORKERS,
+                 output_dir=BATCH_JOB_OUTPUT, stay_threshold=5, traffic_flow=False, num_lanes=2,
+                 backend=MODEL_BACKEND, imgsz=MODEL_IMGSZ, zones=None, lines=None, frame_stride=1,
+                 decode_width=None):
+        """
+        Initialize the job.
+
+        Args:
+            files (list): Paths of the video files.
+            src_points (list): Source points for perspective transform (4x2).
+            model_path (str): Path to the YOLO model file.
+            segment_seconds (float, optional): Split files into segments of this length so one file
+                can use several workers. None analyses every file in one piece.
+            workers (int, optional): Number of worker processes, None for one per CPU core.
+            output_dir (str): Directory receiving the job folder.
+            stay_threshold (int): Time (in video seconds) after which a vehicle stays too long in a zone.
+            traffic_flow (bool): Whether to count crossings of the middle line when no lines are given.
+            num_lanes (int): Number of lanes of the bird's-eye view.
+            backend (str): Inference backend.
+            imgsz (int): Inference image size.
+            zones (dict, optional): Named zones (name -> polygon in bird's-eye coordinates).
+            lines (dict, optional): Named count lines, see LineCounter.
+            frame_stride (int): Analyse every N-th frame (time-lapse), skipped frames are not converted.
+            decode_width (int, optional): Maximum width of decoded frames, src_points, zones and image
+                lines are in this resolution.
+        """
+        self.job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.files = list(files)
+        self.workers = workers or os.cpu_count() or 1
+        self.segment_seconds = segment_seconds
+        self.output_dir = os.path.join(output_dir, self.job_id)
+        self.options = {
+            "model_path": model_path,
+            "src_points": np.asarray(src_points, dtype=np.float32).tolist(),
+            "stay_threshold": stay_threshold,
+            "traffic_flow": traffic_flow,
+            "num_lanes": num_lanes,
+            "backend": backend,
+            "imgsz": imgsz,
+            "zones": {name: np.asarray(polygon, dtype=np.float32).tolist() for name, polygon in (zones or {}).items()},
+            "lines": lines or {},
+            "frame_stride": max(1, int(frame_stride)),
+            "decode_width": decode_width,
+        }
+
+        self.status = "pending"
+        self.error = None
+        self.summary = None
+        self.tasks = []
+        self.frames_total = 0
+        self.frames_done = 0
+        self.start_time = None
+        self.end_time = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def plan(self):
+        """
+        Split the files into tasks.
+
+        Returns:
+            list: One task per file, or per segment when segment_seconds is set.
+        """
+        tasks = []
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        for path in self.files:
+            cap = cv2.VideoCapture(path)
+            if not cap.isOpened():
+                raise ValueError(f"Cannot open video file {path}")
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+            cap.release()
+
+            # Segments start on the stride so every segment samples the same frames as one piece would
+            stride = self.options["frame_stride"]
+            length = int(self.segment_seconds * fps) if self.segment_seconds else frame_count
+            length = max(1, math.ceil(length / stride)) * stride
+            name = os.path.splitext(os.path.basename(path))[0]
+            for segment, start in enumerate(range(0, frame_count, length)):
+                tasks.append(dict(self.options, **{
+                    "index": len(tasks),
+                    "video_path": path,
+                    "name": name,
+                    "segment": segment,
+                    "start_frame": start,
+                    "end_frame": min(start + length, frame_count),
+                    "fps": fps,
+                    "threads": threads,
+                    "output_path": os.path.join(self.output_dir, f"{name}.part{segment:04d}.jsonl"),
+                }))
+        return tasks
+
+    def start(self):
+        """
+        Run the job in the background.
+        """
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Run the job and block until it ends.
+        """
+        self.start_time = time.time()
+        self.status = "running"
+        try:
+            self.tasks = self.plan()
+            self.frames_total = sum(math.ceil((task["end_frame"] - task["start_frame"]) / task["frame_stride"])
+                                    for task in self.tasks)
+            os.makedirs(self.output_dir, exist_ok=True)
+            if self.options["backend"] != "torch":
+                # Export once here rather than in every worker
+                from app.model.Detector import Detector
+                Detector.export(self.options["model_path"], self.options["backend"], self.options["imgsz"])
+
+            # Spawned workers do not inherit the threads and CUDA state of the web process
+            context = multiprocessing.get_context("spawn")
+            with context.Manager() as manager, \
+                    ProcessPoolExecutor(max_workers=min(self.workers, len(self.tasks) or 1), mp_context=context) as pool:
+                progress = manager.Queue()
+                collector = threading.Thread(target=self.collect_progress, args=(progress,), daemon=True)
+                collector.start()
+                try:
+                    futures = [pool.submit(analyze_segment, task, progress) for task in self.tasks]
+                    results = [future.result() for future in as_completed(futures)]
+                finally:
+                    progress.put(None)
+                    collector.join()
+
+            self.summary = self.merge(results)
+            self.status = "done"
+        except Exception as e:
+            print(f"[BatchJob] Job {self.job_id} failed: {e}")
+            self.error = str(e)
+            self.status = "failed"
+        finally:
+            self.end_time = time.time()
+
+    def collect_progress(self, progress):
+        """
+        Add up the progress reports of the workers until the job ends.
+        """
+        while True:
+            report = progress.get()
+            if report is None:
+                break
+            with self.lock:
+                self.frames_done += report[1]
+
+    def merge(self, results):
+        """
+        Concatenate the parts of each file in frame order and add up the counters.
+
+        Args:
+            results (list): Results of analyze_segment.
+
+        Returns:
+            dict: Per-file and total counters and frame counts, also written to summary.json.
+        """
+        by_index = {result["index"]: result for result in results}
+        summary = {"job_id": self.job_id, "files": {}, "total": {}}
+        for task in self.tasks:
+            path = os.path.join(self.output_dir, f"{task['name']}.jsonl")
+            with open(path, "w" if task["segment"] == 0 else "a") as output, open(task["output_path"]) as part:
+                for line in part:
+                    output.write(line)
+            os.remove(task["output_path"])
+
+            entry = summary["files"].setdefault(task["video_path"], {"output": path, "frames": 0, "counters": {}})
+            entry["frames"] += by_index[task["index"]]["frames"]
+            merge_counters(entry["counters"], by_index[task["index"]]["counters"])
+            merge_counters(summary["total"], by_index[task["index"]]["counters"])
+
+        with open(os.path.join(self.output_dir, "summary.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+    def get_status(self):
+        """
+        Get the state of the job.
+
+        Returns:
+            dict: Status, progress, throughput, ETA (in seconds) and, once done, the summary.
+        """
+        with self.lock:
+            frames_done = self.frames_done
+        elapsed = ((self.end_time or time.time()) - self.start_time) if self.start_time else 0.0
+        fps = frames_done / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self.frames_total - frames_done)
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "files": self.files,
+            "tasks": len(self.tasks),
+            "workers": self.workers,
+            "frames_done": frames_done,
+            "frames_total": self.frames_total,
+            "progress": round(frames_done / self.frames_total, 4) if self.frames_total else None,
+            "elapsed_seconds": round(elapsed, 1),
+            "frames_per_second": round(fps, 1),
+            "eta_seconds": round(remaining / fps, 1) if self.status == "running" and fps > 0 else None,
+            "output": self.output_dir,
+            "summary": self.summary,
+            "error": self.error,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse video files offline")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--src-points", required=True, type=float, nargs=8, metavar="XY",
+                        help="Four source points for the perspective transform: x1 y1 x2 y2 x3 y3 x4 y4")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--backend", default=MODEL_BACKEND)
+    parser.add_argument("--imgsz", type=int, default=MODEL_IMGSZ)
+    parser.add_argument("--segment-seconds", type=float, default=None)
+    parser.add_argument("--workers", type=int, default=BATCH_JOB_WORKERS)
+    parser.add_argument("--output", default=BATCH_JOB_OUTPUT)
+    parser.add_argument("--traffic-flow", action="store_true")
+    parser.add_argument("--frame-stride", type=int, default=1, help="Analyse every N-th frame")
+    parser.add_argument("--decode-width", type=int, default=None, help="Maximum width of decoded frames")
+    args = parser.parse_args()
+
+    job = BatchJob(args.files, np.array(args.src_points).reshape(4, 2), args.model, args.segment_seconds,
+                   args.workers, args.output, traffic_flow=args.traffic_flow, backend=args.backend, imgsz=args.imgsz,
+                   frame_stride=args.frame_stride, decode_width=args.decode_width)
+    job.start()
+    while job.thread.is_alive():
+        job.thread.join(2.0)
+        status = job.get_status()
+        print(f"[BatchJob] {status['frames_done']}/{status['frames_total']} frames, "
+              f"{status['frames_per_second']} fps, ETA {status['eta_seconds']} s")
+    status = job.get_status()
+    print(f"[BatchJob] {status['status']}: {status['output']}" + (f" ({status['error']})" if status["error"] else ""))
@@ -0,0 +1,278 @@
+import json
+import time
+import threading
+import multiprocessing
+from app.model.ModelRegistry import model_registry
+from app.util.EventHub import EventHub
+from app.util.FrameCache import FrameCache
+from app.util.SharedRing import SharedRing
+from app.config.config import FRAME_RING_SLOTS, MESSAGE_RING_SLOTS, MESSAGE_RING_SLOT_SIZE, SERVICE_STATS_INTERVAL, \
+    FILE_FRAME_STRIDE
+
+VIEWS = ("row", "processed", "birdview")
+
+
+def run_service_worker(cap_type, cap_path, frame_stride, model_path, src_points, options, access, ready, conn,
+                       service_count):
+    """
+    Worker process: run a YoloService and publish its outputs into shared memory rings.
+
+    Args:
+        cap_type (str): Capture source type, see Camera.setCap.
+        cap_path (str): Capture source path.
+        frame_stride (int): For files, analyse every N-th frame.
+        model_path (str): Path to the YOLO model file.
+        src_points (ndarray): Source points for perspective transform.
+        options (dict): Further YoloService keyword arguments.
+        access (multiprocessing.Array): Monotonic time of the last consumer request of each view.
+        ready (multiprocessing.Event): Set whenever a ring was written.
+        conn (multiprocessing.connection.Connection): Control channel to the web process.
+        service_count (multiprocessing.Value): Running services of the application, see ModelRegistry.share_count.
+    """
+    from app.util.Camera import Camera
+    from app.util.RingEventHub import RingEventHub
+    from app.util.RingFrameCache import RingFrameCache
+    from app.service.YoloService import YoloService
+    from app.model.ModelRegistry import model_registry
+
+    # The latency controller steps down as services are added anywhere in the application
+    model_registry.use_shared_count(service_count)
+    rings = []
+    try:
+        camera = Camera()
+        camera.setCap(cap_type, cap_path, frame_stride)
+        cap = camera.cap
+        if cap is None or not cap.isOpened():
+            conn.send(("error", f"Failed to open camera. Type: {cap_type}, Path: {cap_path}"))
+            return
+        service = YoloService(model_path, src_points, cap, **options)
+
+        # Slots are sized for the source resolution, the bird's-eye view is 800x500
+        frame_size = max(int(cap.get(3)) * int(cap.get(4)) * 3, 800 * 500 * 3)
+        frame_rings = {view: SharedRing(slots=FRAME_RING_SLOTS, slot_size=frame_size, create=True) for view in VIEWS}
+        message_ring = SharedRing(slots=MESSAGE_RING_SLOTS, slot_size=MESSAGE_RING_SLOT_SIZE, create=True)
+        rings = list(frame_rings.values()) + [message_ring]
+        service.frame_caches = {view: RingFrameCache(frame_rings[view], access, index, ready)
+                                for index, view in enumerate(VIEWS)}
+        service.event_hub = RingEventHub(message_ring, ready)
+        conn.send(("ready", {view: ring.name for view, ring in frame_rings.items()}, message_ring.name))
+    except Exception as e:
+        conn.send(("error", str(e)))
+        for ring in rings:
+            ring.close()
+        return
+
+    def serve_control():
+        # Control-plane requests of the web process: stop and statistics range queries
+        try:
+            while True:
+                request = conn.recv()
+                if request[0] == "stop":
+                    service.release()
+                    break
+                if request[0] == "statistics_range":
+                    try:
+                        conn.send(("ok", service.get_statistics_range(*request[1:])))
+                    except ValueError as e:
+                        conn.send(("error", str(e)))
+        except (EOFError, OSError):
+            service.release()
+
+    def publish_statistics():
+        while service.running:
+            try:
+                service.event_hub.send({"stats": service.get_statistics()})
+            except Exception as e:
+                # e.g. a counter dict growing under json.dumps, the next round sends it again
+                print(f"[ServiceProcess] Error while publishing statistics: {e}")
+            time.sleep(SERVICE_STATS_INTERVAL)
+
+    threading.Thread(target=serve_control, daemon=True).start()
+    threading.Thread(target=publish_statistics, daemon=True).start()
+    try:
+        service.start()
+    finally:
+        ready.set()
+        for ring in rings:
+            ring.close()
+
+
+class ServiceProcess:
+    """
+    Runs a YoloService in its own worker process, so every camera gets its own interpreter
+    and GIL, and mirrors its outputs in the web process with the YoloService interface
+    used by the routes.
+
+    Frames come back through one SharedRing per view, statistics and events through a
+    message ring; the web process only copies each new frame out of shared memory once.
+    Consumer activity (which views to render) goes the other way through a shared array.
+    The detector is loaded per process, so services in process mode do not share weights.
+    """
+
+    def __init__(self, cap_type, cap_path, model_path, src_points, frame_stride=FILE_FRAME_STRIDE, **options):
+        """
+        Start the worker process and wait until its service is set up.
+
+        Args:
+            cap_type (str): Capture source type, see Camera.setCap.
+            cap_path (str): Capture source path.
+            model_path (str): Path to the YOLO model file.
+            src_points (np.array): Source points for perspective transform.
+            frame_stride (int): For files, analyse every N-th frame.
+            **options: Further YoloService keyword arguments.
+
+        Raises:
+            RuntimeError: If the worker could not open the source or load the model.
+        """
+        if options.get("backend", "torch") != "torch":
+            # Exported once by the web process instead of by each worker
+            from app.model.Detector import Detector
+            Detector.export(model_path, options["backend"], options.get("imgsz", 640))
+
+        context = multiprocessing.get_context("spawn")
+        self.access = context.RawArray('d', len(VIEWS))
+        self.ready = context.Event()
+        self.conn, worker_conn = context.Pipe()
+        self.conn_lock = threading.Lock()
+        self.process = context.Process(
+            target=run_service_worker,
+            args=(cap_type, cap_path, frame_stride, model_path, src_points, options, self.access, self.ready, worker_conn,
+                  model_registry.share_count(context)),
+            daemon=True,
+        )
+        self.process.start()
+        worker_conn.close()
+
+        try:
+            reply = self.conn.recv() if self.conn.poll(120) else ("error", "Worker process did not start in time")
+        except EOFError:
+            reply = ("error", f"Worker process exited with code {self.process.exitcode}")
+        if reply[0] != "ready":
+            self.process.join(1)
+            raise RuntimeError(reply[1])
+        self.frame_rings = {view: SharedRing(name) for view, name in reply[1].items()}
+        self.message_ring = SharedRing(reply[2])
+
+        self.frame_caches = {view: FrameCache() for view in VIEWS}
+        self.frame_sequences = {view: 0 for view in VIEWS}
+        self.message_sequence = 0
+        self.statistics = {}
+        self.event_hub = EventHub()
+
+        # Frame notification for streaming consumers
+        self.running = True
+        self.frame_id = 0
+        self.frame_condition = threading.Condition()
+
+    def start(self):
+        """
+        Mirror the outputs of the worker and block until it ends.
+        """
+        try:
+            while self.running and self.process.is_alive():
+                if not self.ready.wait(0.1):
+                    self.sync_access()
+                    continue
+                self.ready.clear()
+                self.sync_access()
+                self.pull_messages()
+                if self.pull_frames():
+                    with self.frame_condition:
+                        self.frame_id += 1
+                        self.frame_condition.notify_all()
+        except Exception as e:
+            print(f"[ServiceProcess] Error while reading worker output: {e}")
+        finally:
+            self.release()
+            self.process.join(5)
+            for ring in list(self.frame_rings.values()) + [self.message_ring]:
+                ring.close()
+
+    def sync_access(self):
+        """
+        Hand the consumer activity of each view to the worker.
+        """
+        for index, view in enumerate(VIEWS):
+            self.access[index] = self.frame_caches[view].last_access
+
+    def pull_frames(self):
+        """
+        Copy the newest frame of each view out of its ring.
+
+        Returns:
+            bool: Whether any view got a new frame.
+        """
+        updated = False
+        for view, ring in self.frame_rings.items():
+            sequence, frame = ring.read_latest(self.frame_sequences[view])
+            if frame is not None:
+                self.frame_sequences[view] = sequence
+                self.frame_caches[view].update(frame)
+                updated = True
+        return updated
+
+    def pull_messages(self):
+        """
+        Apply the statistics and forward the events written by the worker.
+        """
+        self.message_sequence, messages, lost = self.message_ring.read_since(self.message_sequence)
+        if lost:
+            print(f"[ServiceProcess] {lost} messages were overwritten before they were read")
+        for message in messages:
+            message = json.loads(message)
+            if "stats" in message:
+                self.statistics = message["stats"]
+            else:
+                self.statistics = dict(self.statistics, **message["delta"])
+                self.event_hub.publish(message["delta"], message["events"])
+
+    def get_statistics(self):
+        """
+        Retrieve the vehicle tracking statistics last published by the worker.
+        """
+        return self.statistics
+
+    def get_statistics_range(self, resolution="minute", start=None, end=None):
+        """
+        Retrieve event counts over a time range from the worker, see YoloService.get_statistics_range.
+        """
+        with self.conn_lock:
+            self.conn.send(("statistics_range", resolution, start, end))
+            status, result = self.conn.recv()
+        if status != "ok":
+            raise ValueError(result)
+        return result
+
+    def get_frame_cache(self, view):
+        """
+        Get the frame cache of a view, see YoloService.get_frame_cache.
+        """
+        if view not in self.frame_caches:
+            raise ValueError(f"Unknown view: {view}")
+        return self.frame_caches[view]
+
+    def wait_for_frame(self, last_frame_id, timeout=1.0):
+        """
+        Block until a frame newer than last_frame_id has been produced, see YoloService.wait_for_frame.
+        """
+        with self.frame_condition:
+            while self.running and self.frame_id <= last_frame_id:
+                self.frame_condition.wait(timeout)
+            if not self.running:
+                return None
+            return self.frame_id
+
+    def release(self):
+        """
+        Stop the worker process. Its service releases the capture and the detector.
+        """
+        with self.frame_condition:
+            was_running, self.running = self.running, False
+            self.frame_condition.notify_all()
+        self.event_hub.close()
+        if was_running:
+            try:
+                with self.conn_lock:
+                    self.conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
@@ -1,5 +1,17 @@
-import queue
+import cv2
+import time
+import threading
+from collections import deque
 from app.model.YoloModel import YoloModel
+from app.model.MotionGate import MotionGate
+from app.model.AdaptiveStride import AdaptiveStride
+from app.model.ResolutionController import ResolutionController
+from app.util.FrameCache import FrameCache
+from app.util.EventHub import EventHub
+from app.util.FrameSlot import FrameSlot
+from app.util.LiveCapture import LiveCapture
+from app.config.config import RENDER_IDLE_TIMEOUT, ROI_MARGIN, MOTION_PIXEL_THRESHOLD, MOTION_AREA_THRESHOLD, \
+    MOTION_MAX_SKIP, STRIDE_TARGET_FPS, STRIDE_MAX, RESOLUTION_LADDER
 
 
 class YoloService:
@@ -8,7 +20,10 @@ class YoloService:
     model inference, and returning various frame outputs to upstream consumers.
     """
 
-    def __init__(self, model_path, src_points, cap, hot_zone=None, stay_threshold=5, traffic_flow=False, num_lanes=2):
+    def __init__(self, model_path, src_points, cap, hot_zone=None, stay_threshold=5, traffic_flow=False, num_lanes=2,
+                 frame_policy=FrameSlot.DROP_OLDEST, backend="torch", imgsz=640, roi_crop=False, roi_mask=False,
+                 motion_gate=False, adaptive_stride=False, latency_target_ms=None, zones=None,
+                 lines=None):
         """
         Initialize the YoloService.
 
@@ -20,127 +35,281 @@ class YoloService:
             stay_threshold (int): Time (in seconds) after which a vehicle is considered as staying too long in hot zone.
             traffic_flow (bool): Whether to enable traffic flow counting (crossing middle line).
             num_lanes (int): Number of lanes to draw in the bird's-eye view.
+            frame_policy (str): "latest" to always run inference on the freshest frame (live sources),
+                "all" to process every frame (file sources).
+            backend (str): Inference backend of the shared detector.
+            imgsz (int): Inference image size of the shared detector.
+            roi_crop (bool): Run the detector only on the region around src_points.
+            roi_mask (bool): With roi_crop, also blank the pixels outside the src_points polygon.
+            motion_gate (bool): Skip the detector on frames where the road region did not change.
+            adaptive_stride (bool): Run the detector every k-th frame, with k tuned to keep up with the
+                source frame rate, and predict the tracks in between.
+            latency_target_ms (float, optional): p95 detection latency target. When set, the detector
+                input size moves along RESOLUTION_LADDER to meet it.
+            zones (dict, optional): Named zones (name -> polygon in bird's-eye coordinates) monitored
+                for long stays.
+            lines (dict, optional): Named count lines, see LineCounter.
         """
-        self.model = YoloModel(model_path, src_points, hot_zone, stay_threshold, traffic_flow, num_lanes)
-        self.rowQueue = queue.Queue(maxsize=5)  # Stores original frames
-        self.processedQueue = queue.Queue(maxsize=5)  # Stores annotated frames with tracking results
-        self.birdViewQueue = queue.Queue(maxsize=5)  # Stores bird's-eye view output
+        self.model = YoloModel(model_path, src_points, hot_zone, stay_threshold, traffic_flow, num_lanes,
+                               backend=backend, imgsz=imgsz,
+                               roi_crop=roi_crop, roi_mask=roi_mask, roi_margin=ROI_MARGIN,
+                               motion_gate=MotionGate(MOTION_PIXEL_THRESHOLD, MOTION_AREA_THRESHOLD,
+                                                      MOTION_MAX_SKIP) if motion_gate else None,
+                               adaptive_stride=AdaptiveStride(self.source_fps(cap), STRIDE_MAX)
+                               if adaptive_stride else None,
+                               resolution_controller=ResolutionController(RESOLUTION_LADDER, latency_target_ms, imgsz)
+                               if latency_target_ms else None,
+                               zones=zones, lines=lines)
         self.cap = cap
-        
-        # Cache for last frames to prevent flickering
-        self.last_row_frame = None
-        self.last_processed_frame = None
-        self.last_birdview_frame = None
+
+        # Pipeline stages (capture -> inference -> render) connected by bounded slots
+        self.frame_policy = frame_policy
+        self.capture_slot = FrameSlot(frame_policy)
+        self.render_slot = FrameSlot(frame_policy)
+
+        # Latest frame of each output with a shared, encode-once JPEG
+        self.frame_caches = {
+            "row": FrameCache(),
+            "processed": FrameCache(),
+            "birdview": FrameCache(),
+        }
+
+        # Time from grabbing a frame to publishing its outputs (seconds)
+        self.capture_ages = deque(maxlen=100)
+
+        # Frame notification for streaming consumers
+        self.running = True
+        self.frame_id = 0
+        self.frame_condition = threading.Condition()
+
+        # Push channel for statistics deltas and events
+        self.event_hub = EventHub()
+        self.published_counters = None  # Counters as of the last published delta
 
     @staticmethod
-    def try_put(q, item):
+    def source_fps(cap):
         """
-        Try to put an item into a queue without blocking.
-        If queue is full, clear it and put the new item to ensure latest frame is always available.
+        Get the frame rate the service has to keep up with.
 
         Args:
-            q (queue.Queue): The queue to put the item into.
-            item (any): The item to put into the queue.
+            cap (cv2.VideoCapture): OpenCV video capture object.
+
+        Returns:
+            float: The frame rate reported by the source, or STRIDE_TARGET_FPS if it reports none.
         """
-        try:
-            q.put_nowait(item)
-        except queue.Full:
-            # Clear the queue and put the latest frame
-            while not q.empty():
-                try:
-                    q.get_nowait()
-                except queue.Empty:
-                    break
-            q.put_nowait(item)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        return fps if fps and 0 < fps <= 120 else STRIDE_TARGET_FPS
 
     def start(self):
         """
-        Start reading frames from video stream and processing them with the model.
-        Processed frames are placed in their respective queues.
+        Start the processing pipeline and block until it ends.
+        Capture and inference run on their own threads while rendering runs on the
+        calling thread, so decoding, inference and drawing of consecutive frames overlap.
+        """
+        stages = [
+            threading.Thread(target=self.capture_loop, daemon=True),
+            threading.Thread(target=self.inference_loop, daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+        try:
+            self.render_loop()
+        finally:
+            self.release()
+            for stage in stages:
+                stage.join()
+            # Only give the shared detector back once no stage can use it any more
+            self.model.release()
+
+    def capture_loop(self):
+        """
+        Pipeline stage: read frames from the video stream into the capture slot.
         """
-        import time
         try:
-            frame_count = 0
-            while True:
+            while self.running:
                 ret, frame = self.cap.read()
-                if ret:
-                    frame_count += 1
-                    processed, row, birdView = self.model.track(frame)
-
-                    # Update cache with latest frames
-                    self.last_row_frame = row.copy()
-                    self.last_processed_frame = processed.copy()
-                    self.last_birdview_frame = birdView.copy()
-
-                    # Queue the results
-                    self.try_put(self.processedQueue, processed)
-                    self.try_put(self.rowQueue, row)
-                    self.try_put(self.birdViewQueue, birdView)
-                    
-                    # Small delay to prevent overwhelming the system
-                    if frame_count % 10 == 0:  # Every 10 frames
-                        time.sleep(0.01)  # 10ms delay
-                else:
+                if not ret:
+                    break
+                # Live captures report when the frame was grabbed, other sources are read on demand
+                capture_time = getattr(self.cap, "frame_time", None) or time.monotonic()
+                if not self.capture_slot.put((frame, capture_time)):
                     break
         except Exception as e:
-            print(f"[YoloService] Error during processing: {e}")
+            print(f"[YoloService] Error during capture: {e}")
         finally:
-            self.release()
+            self.capture_slot.close()
+            # Released by the thread reading from it, never under a running read()
+            self.cap.release()
+
+    def inference_loop(self):
+        """
+        Pipeline stage: run detection, tracking and statistics on captured frames.
+        """
+        try:
+            while self.running:
+                item = self.capture_slot.get()
+                if item is None:
+                    break
+                frame, capture_time = item
+                tracking = self.model.infer(frame)
+                self.publish_events(tracking["events"])
+                if not self.render_slot.put((frame, tracking, capture_time)):
+                    break
+        except Exception as e:
+            print(f"[YoloService] Error during inference: {e}")
+        finally:
+            self.render_slot.close()
+
+    def publish_events(self, events):
+        """
+        Push the events of a frame and the counters they changed to event stream clients.
+        Counters only change with events, so frames without events publish nothing.
+
+        Args:
+            events (list): Events returned by YoloModel.infer().
+        """
+        if not events or not self.event_hub.has_subscribers():
+            return
+        counters = self.model.get_counters()
+        previous = self.published_counters or {}
+        delta = {key: value for key, value in counters.items() if previous.get(key) != value}
+        self.published_counters = counters
+        self.event_hub.publish(delta, events)
+
+    def render_loop(self):
+        """
+        Pipeline stage: draw the outputs of tracked frames and publish them to consumers.
+        The annotated and bird's-eye views are only drawn while a consumer has requested
+        them within RENDER_IDLE_TIMEOUT seconds.
+        """
+        try:
+            while self.running:
+                item = self.render_slot.get()
+                if item is None:
+                    break
+                row, tracking, capture_time = item
+                render_processed = self.frame_caches["processed"].is_active(RENDER_IDLE_TIMEOUT)
+                render_birdview = self.frame_caches["birdview"].is_active(RENDER_IDLE_TIMEOUT)
+                processed, birdView = None, None
+                if render_processed or render_birdview:
+                    processed, birdView = self.model.render(row, tracking, render_processed, render_birdview)
+
+                # Publish immutable snapshots to the shared frame caches, every output by reference
+                self.frame_caches["row"].update(row)
+                if processed is not None:
+                    self.frame_caches["processed"].update(processed)
+                if birdView is not None:
+                    self.frame_caches["birdview"].update(birdView)
+
+                self.capture_ages.append(time.monotonic() - capture_time)
+
+                # Wake up streaming consumers waiting for a new frame
+                with self.frame_condition:
+                    self.frame_id += 1
+                    self.frame_condition.notify_all()
+        except Exception as e:
+            print(f"[YoloService] Error during rendering: {e}")
 
     def get_statistics(self):
         """
         Retrieve the current vehicle tracking statistics.
 
         Returns:
-            dict: Includes total count, category breakdown, long stays, and crossings.
+            dict: Includes total count, category breakdown, long stays, crossings, the mean
+                capture age (ms, from grabbing a frame to publishing its outputs) and, for live
+                sources, the connection state.
+        """
+        statistics = self.model.get_statistics()
+        ages = list(self.capture_ages)
+        statistics["capture_age_ms"] = round(1000 * sum(ages) / len(ages), 2) if ages else None
+        if hasattr(self.cap, "get_statistics"):
+            statistics["capture"] = self.cap.get_statistics()
+        return statistics
+
+    def get_statistics_range(self, resolution="minute", start=None, end=None):
+        """
+        Retrieve event counts over a time range.
+
+        Args:
+            resolution (str): "second", "minute" or "hour".
+            start (float, optional): Start of the range (Unix time).
+            end (float, optional): End of the range (Unix time).
+
+        Returns:
+            dict: Bucket start times and per-bucket counts of each series.
         """
-        return self.model.get_statistics()
+        return self.model.timeline.query(resolution, start, end)
 
     def get_row_frame(self):
         """
-        Get the latest original (unprocessed) frame from the queue.
-        If queue is empty, return the last cached frame.
+        Get the latest original (unprocessed) frame.
 
         Returns:
-            np.ndarray or None: The raw frame if available, otherwise None.
+            np.ndarray or None: The raw frame (read-only) if available, otherwise None.
         """
-        if not self.rowQueue.empty():
-            frame = self.rowQueue.get()
-            self.last_row_frame = frame.copy()
-            return frame
-        return self.last_row_frame
+        return self.frame_caches["row"].get_frame()[1]
 
     def get_processed_frame(self):
         """
         Get the latest annotated frame (with detection and tracking info).
-        If queue is empty, return the last cached frame.
 
         Returns:
-            np.ndarray or None: The processed frame if available, otherwise None.
+            np.ndarray or None: The processed frame (read-only) if available, otherwise None.
         """
-        if not self.processedQueue.empty():
-            frame = self.processedQueue.get()
-            self.last_processed_frame = frame.copy()
-            return frame
-        return self.last_processed_frame
+        return self.frame_caches["processed"].get_frame()[1]
 
     def get_birdView_frame(self):
         """
         Get the latest bird's-eye view frame showing vehicle trajectories.
-        If queue is empty, return the last cached frame.
 
         Returns:
-            np.ndarray or None: The bird's-eye view frame if available, otherwise None.
+            np.ndarray or None: The bird's-eye view frame (read-only) if available, otherwise None.
+        """
+        return self.frame_caches["birdview"].get_frame()[1]
+
+    def get_frame_cache(self, view):
+        """
+        Get the shared frame cache of a view.
+
+        Args:
+            view (str): "row", "processed" or "birdview".
+
+        Returns:
+            FrameCache: The cache holding the latest frame and its JPEG encoding.
+        """
+        if view not in self.frame_caches:
+            raise ValueError(f"Unknown view: {view}")
+        return self.frame_caches[view]
+
+    def wait_for_frame(self, last_frame_id, timeout=1.0):
+        """
+        Block until a frame newer than last_frame_id has been produced.
+
+        Args:
+            last_frame_id (int): ID of the last frame seen by the caller.
+            timeout (float): Maximum time (in seconds) to wait before re-checking the service state.
+
+        Returns:
+            int or None: The ID of the newest frame, or None if the service has stopped.
         """
-        if not self.birdViewQueue.empty():
-            frame = self.birdViewQueue.get()
-            self.last_birdview_frame = frame.copy()
-            return frame
-        return self.last_birdview_frame
+        with self.frame_condition:
+            while self.running and self.frame_id <= last_frame_id:
+                self.frame_condition.wait(timeout)
+            if not self.running:
+                return None
+            return self.frame_id
 
     def release(self):
         """
-        Release resources including the video capture and reset tracking statistics.
+        Stop the pipeline. The capture stage releases the video capture and start() resets
+        the statistics once the stages have stopped, as they may still be using them.
         """
-        self.cap.release()
-        self.model.reset_statistics()
+        with self.frame_condition:
+            self.running = False
+            self.frame_condition.notify_all()
+        self.capture_slot.close()
+        self.render_slot.close()
+        self.event_hub.close()
+        if isinstance(self.cap, LiveCapture):
+            # Safe from any thread, and wakes up a capture stage waiting for a dropped stream
+            self.cap.release()
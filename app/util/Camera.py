@@ -1,5 +1,7 @@
 import cv2
 from app.config.config import *
+from app.util.LiveCapture import LiveCapture
+from app.util.FileCapture import FileCapture
 
 
 class Camera:
@@ -21,16 +23,18 @@ class Camera:
             raise Exception("Camera not initialized")
         return self.cap
 
-    def setCap(self, cap_type, cap_path):
+    def setCap(self, cap_type, cap_path, frame_stride=FILE_FRAME_STRIDE):
         """
         Set the video capture object
         Args:
             cap_type(str): "ip_camera", "camera" or "file"
             cap_path(str): the path of the video file or the camera ID/url
+            frame_stride(int): for files, analyse every N-th frame
         """
         if cap_type == "ip_camera":
             self.ip_camera_url = cap_path
-            self.cap = cv2.VideoCapture(self.ip_camera_url)
+            # Stale-frame draining and reconnection for network streams
+            self.cap = LiveCapture(self.ip_camera_url) if LIVE_CAPTURE else cv2.VideoCapture(self.ip_camera_url)
         elif cap_type == "camera":
             # 对于电脑摄像头，将cap_path转换为整数
             try:
@@ -48,7 +52,8 @@ class Camera:
             # 构建完整的视频文件路径
             import os
             video_path = os.path.join("./videos", cap_path)
-            self.cap = cv2.VideoCapture(video_path)
+            # Multi-threaded decoding, scaled down to FILE_DECODE_WIDTH, with frame skipping
+            self.cap = FileCapture(video_path, stride=frame_stride)
             print(f"Video file initialized: {video_path}")
         else:
             print("Invalid cap_type")
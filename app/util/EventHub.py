@@ -0,0 +1,68 @@
+import threading
+from app.util.EventSubscriber import EventSubscriber
+
+
+class EventHub:
+    """
+    Fans out the statistics deltas and events of one service to its event stream clients.
+    Publishing with no subscriber is free, so idle services pay nothing for the channel.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def subscribe(self):
+        """
+        Register a new client.
+
+        Returns:
+            EventSubscriber: The client's buffer, already closed if the hub is.
+        """
+        subscriber = EventSubscriber()
+        with self.lock:
+            if self.closed:
+                subscriber.close()
+            else:
+                self.subscribers = self.subscribers + [subscriber]
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """
+        Remove a client.
+        """
+        with self.lock:
+            self.subscribers = [s for s in self.subscribers if s is not subscriber]
+        subscriber.close()
+
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    def publish(self, delta, events):
+        """
+        Push a statistics delta and the events of a frame to every client.
+
+        Args:
+            delta (dict): Changed statistics with their new values, may be empty.
+            events (list): Discrete events, may be empty.
+        """
+        # The list is replaced, never mutated, so it can be iterated without the lock
+        for subscriber in self.subscribers:
+            if events:
+                subscriber.push(events)
+            if delta:
+                subscriber.push_stats(delta)
+            if subscriber.dropped:
+                print("[EventHub] Dropped a client that fell behind")
+                self.unsubscribe(subscriber)
+
+    def close(self):
+        """
+        Close the hub and all its clients.
+        """
+        with self.lock:
+            self.closed = True
+            subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
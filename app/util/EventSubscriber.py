@@ -0,0 +1,86 @@
+import threading
+from collections import deque
+from app.config.config import EVENT_BUFFER_SIZE
+
+
+class EventSubscriber:
+    """
+    Outbound buffer of one event stream client.
+
+    Statistics deltas are coalesced: a client that has not picked up the previous delta
+    gets a single merged one. Discrete events are queued up to max_pending; a client that
+    falls further behind is dropped instead of holding back the publisher.
+    """
+
+    def __init__(self, max_pending=EVENT_BUFFER_SIZE):
+        """
+        Initialize the subscriber.
+
+        Args:
+            max_pending (int): Maximum number of queued events.
+        """
+        self.max_pending = max_pending
+        self.events = deque()
+        self.stats = {}  # Coalesced statistics delta not yet sent
+        self.closed = False
+        self.dropped = False
+        self.condition = threading.Condition()
+
+    def push(self, events):
+        """
+        Queue discrete events, dropping the client if its buffer overflows.
+
+        Args:
+            events (list): Events to queue.
+        """
+        with self.condition:
+            if self.closed:
+                return
+            if len(self.events) + len(events) > self.max_pending:
+                self.dropped = True
+                self.closed = True
+                self.events.clear()
+            else:
+                self.events.extend(events)
+            self.condition.notify()
+
+    def push_stats(self, delta):
+        """
+        Merge a statistics delta into the pending one.
+
+        Args:
+            delta (dict): Changed statistics with their new values.
+        """
+        with self.condition:
+            if self.closed:
+                return
+            self.stats.update(delta)
+            self.condition.notify()
+
+    def get(self, timeout):
+        """
+        Wait for pending data and take all of it.
+
+        Args:
+            timeout (float): Maximum time (in seconds) to wait.
+
+        Returns:
+            tuple or None: (statistics delta, events), both empty on timeout,
+                or None once the subscriber is closed.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed or self.stats or self.events, timeout)
+            if self.closed:
+                return None
+            stats, events = self.stats, list(self.events)
+            self.stats = {}
+            self.events.clear()
+            return stats, events
+
+    def close(self):
+        """
+        Close the subscriber and wake up its client.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
@@ -0,0 +1,106 @@
+import math
+import cv2
+from app.config.config import FILE_DECODE_WIDTH, FILE_FRAME_STRIDE, FILE_DECODE_THREADS, FILE_HW_DECODE, \
+    FILE_SEEK_STRIDE
+
+
+class FileCapture:
+    """
+    Reader for video files with the read/get/set/isOpened/release interface of cv2.VideoCapture,
+    tuned for sources that are much larger than the detector input.
+
+    - The FFmpeg decoder runs with a given number of threads (and on the GPU when available).
+    - Frames wider than width are scaled down right after decoding, so inference pre-processing,
+      rendering and encoding work on small frames. Decoding itself still runs at the native
+      resolution, OpenCV does not pass decoder options such as FFmpeg's "lowres" through.
+    - With stride N only every N-th frame is returned: frames in between are grabbed without
+      color conversion, or skipped with a container-level seek for strides of FILE_SEEK_STRIDE
+      and more. The reported frame rate is divided by N, so tracking and stay times follow
+      video time.
+    """
+
+    def __init__(self, path, width=FILE_DECODE_WIDTH, stride=FILE_FRAME_STRIDE, threads=FILE_DECODE_THREADS,
+                 hw_decode=FILE_HW_DECODE):
+        """
+        Open the file.
+
+        Args:
+            path (str): Path of the video file.
+            width (int, optional): Maximum width of the returned frames, None for the native size.
+            stride (int): Return every stride-th frame.
+            threads (int): FFmpeg decoding threads, 0 for OpenCV's default.
+            hw_decode (bool): Ask for hardware accelerated decoding.
+        """
+        self.path = path
+        self.stride = max(1, int(stride))
+        params = [cv2.CAP_PROP_N_THREADS, int(threads)] if threads else []
+        if hw_decode:
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        self.cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG, params)
+
+        native_width, native_height = self.cap.get(cv2.CAP_PROP_FRAME_WIDTH), self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        self.width = int(width) if width and native_width > width else None
+        scale = self.width / native_width if self.width else 1.0
+        self.size = (round(native_width * scale), round(native_height * scale))
+        self.position = 0  # Index (in source frames) of the next frame to decode
+
+    def read(self):
+        """
+        Read the next frame, skipping stride - 1 frames after it.
+
+        Returns:
+            tuple: (ret, frame) like cv2.VideoCapture.read().
+        """
+        ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        self.position += 1
+        if self.stride > 1:
+            self.skip(self.stride - 1)
+        if self.width and frame.shape[1] > self.width:
+            height = round(frame.shape[0] * self.width / frame.shape[1])
+            frame = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        return True, frame
+
+    def skip(self, count):
+        """
+        Move count frames forward without converting them.
+        """
+        if count >= FILE_SEEK_STRIDE:
+            self.seek(self.position + count)
+            return
+        for _ in range(count):
+            if not self.cap.grab():
+                break
+            self.position += 1
+
+    def seek(self, frame_index):
+        """
+        Move to a source frame index at the container level.
+        """
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        self.position = frame_index
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.size[0]
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.size[1]
+        value = self.cap.get(prop)
+        if prop == cv2.CAP_PROP_FPS:
+            return value / self.stride
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return math.ceil(value / self.stride)
+        return value
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.seek(int(value))
+            return True
+        return self.cap.set(prop, value)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
@@ -0,0 +1,108 @@
+import time
+import threading
+import cv2
+from app.config.config import JPEG_QUALITY
+
+
+class FrameCache:
+    """
+    Latest frame of one service output together with its generation number
+    and a JPEG encoding that is produced once and shared by every consumer.
+
+    Frames are published as immutable snapshots: the array is made read-only and
+    stored with its generation in a single tuple, so readers get a consistent
+    (generation, frame) pair by reference, without a lock or a copy.
+    """
+
+    def __init__(self, quality=JPEG_QUALITY):
+        """
+        Initialize the frame cache.
+
+        Args:
+            quality (int): JPEG quality used when encoding frames (0-100).
+        """
+        self.quality = quality
+        # Distinguishes generations of different cache instances (e.g. after a restart)
+        self.epoch = f"{time.time_ns():x}"
+        self.snapshot = (0, None)  # (generation, read-only frame), replaced as a whole
+        self.encoded = None  # (generation, jpeg bytes) of the last encoded frame
+        self.last_access = 0.0  # Monotonic time of the last consumer request
+        self.encode_lock = threading.Lock()
+
+    def update(self, frame):
+        """
+        Publish a new frame. The previous encoding becomes stale.
+        The frame is made read-only, the producer must not draw on it afterwards.
+
+        Args:
+            frame (np.ndarray): The new frame.
+        """
+        frame.flags.writeable = False
+        # Only the producing thread publishes, readers see either the old or the new tuple
+        self.snapshot = (self.snapshot[0] + 1, frame)
+
+    def touch(self):
+        """
+        Record that a consumer wants frames of this output.
+        """
+        self.last_access = time.monotonic()
+
+    def is_active(self, timeout):
+        """
+        Check whether a consumer has requested this output recently.
+
+        Args:
+            timeout (float): Time (in seconds) after which a consumer is considered gone.
+
+        Returns:
+            bool: True if the output was requested within the timeout.
+        """
+        return time.monotonic() - self.last_access < timeout
+
+    def get_frame(self):
+        """
+        Get the latest frame and its generation.
+
+        Returns:
+            tuple: (generation, read-only np.ndarray or None)
+        """
+        return self.snapshot
+
+    def get_jpeg(self):
+        """
+        Get the latest frame encoded as JPEG. The frame is encoded at most once per
+        generation, concurrent callers wait for and reuse the same encoding.
+
+        Returns:
+            tuple: (generation, bytes or None)
+        """
+        self.touch()
+        generation, frame = self.get_frame()
+        if frame is None:
+            return generation, None
+
+        encoded = self.encoded
+        if encoded is not None and encoded[0] >= generation:
+            return encoded
+
+        with self.encode_lock:
+            encoded = self.encoded
+            if encoded is not None and encoded[0] >= generation:
+                return encoded
+            ret, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ret:
+                return generation, None
+            self.encoded = (generation, jpeg.tobytes())
+            return self.encoded
+
+    def etag(self, generation):
+        """
+        Build the entity tag of a generation of this cache.
+
+        Args:
+            generation (int): Frame generation.
+
+        Returns:
+            str: Unquoted entity tag.
+        """
+        return f"{self.epoch}-{generation}"
@@ -0,0 +1,82 @@
+import threading
+from collections import deque
+
+
+class FrameSlot:
+    """
+    Bounded hand-off between two pipeline stages.
+
+    With the "latest" policy a producer never blocks: when the slot is full the
+    oldest item is dropped so the consumer always gets the freshest frame.
+    With the "all" policy the producer blocks until the consumer has room,
+    so every frame is processed.
+    """
+
+    DROP_OLDEST = "latest"
+    PROCESS_ALL = "all"
+
+    def __init__(self, policy=DROP_OLDEST, capacity=1):
+        """
+        Initialize the slot.
+
+        Args:
+            policy (str): "latest" (drop oldest) or "all" (process all).
+            capacity (int): Maximum number of items held by the slot.
+        """
+        if policy not in (self.DROP_OLDEST, self.PROCESS_ALL):
+            raise ValueError(f"Unknown frame policy: {policy}")
+        self.policy = policy
+        self.capacity = capacity
+        self.items = deque()
+        self.closed = False
+        self.dropped = 0
+        self.condition = threading.Condition()
+
+    def put(self, item):
+        """
+        Hand an item to the next stage.
+
+        Args:
+            item (any): The item to put into the slot.
+
+        Returns:
+            bool: False if the slot has been closed, otherwise True.
+        """
+        with self.condition:
+            if self.policy == self.DROP_OLDEST:
+                while len(self.items) >= self.capacity:
+                    self.items.popleft()
+                    self.dropped += 1
+            else:
+                while not self.closed and len(self.items) >= self.capacity:
+                    self.condition.wait()
+            if self.closed:
+                return False
+            self.items.append(item)
+            self.condition.notify_all()
+            return True
+
+    def get(self):
+        """
+        Take the next item, blocking until one is available.
+        Items left in a closed slot are still returned before it reports the end.
+
+        Returns:
+            any or None: The next item, or None once the slot is closed and empty.
+        """
+        with self.condition:
+            while not self.items and not self.closed:
+                self.condition.wait()
+            if not self.items:
+                return None
+            item = self.items.popleft()
+            self.condition.notify_all()
+            return item
+
+    def close(self):
+        """
+        Close the slot and wake up all waiting producers and consumers.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
@@ -0,0 +1,164 @@
+import time
+import threading
+import cv2
+from app.config.config import RECONNECT_INITIAL_DELAY, RECONNECT_MAX_DELAY
+
+
+class LiveCapture:
+    """
+    Low-latency reader for live sources (RTSP/HTTP streams) with the read/get/isOpened/release
+    interface of cv2.VideoCapture.
+
+    A reader thread grabs every frame as soon as the source delivers it, so OpenCV's internal
+    buffer never fills up, and only retrieves (converts) a frame when a consumer is waiting
+    for one; frames grabbed in between are discarded. Each frame carries the time it was
+    grabbed, so consumers can report how old it is. When the stream drops, the reader
+    reconnects with exponential backoff while read() keeps waiting, so the consumer does not
+    notice anything but a gap. The capture object belongs to the reader thread, other
+    threads only see the properties recorded when it was opened.
+    """
+
+    def __init__(self, url, initial_delay=RECONNECT_INITIAL_DELAY, max_delay=RECONNECT_MAX_DELAY):
+        """
+        Open the source and start the reader thread.
+
+        Args:
+            url (str): Stream URL (or any source cv2.VideoCapture accepts).
+            initial_delay (float): Seconds to wait before the first reconnection attempt.
+            max_delay (float): Upper bound of the doubling reconnection delay.
+        """
+        self.url = url
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.properties = {}  # Source properties recorded by open()
+        self.cap = self.open()
+        self.opened = self.cap.isOpened()
+
+        self.condition = threading.Condition()
+        self.frame = None
+        self.grab_time = None  # Monotonic time the pending frame was grabbed
+        self.frame_time = None  # Monotonic time the frame last returned by read() was grabbed
+        self.waiting = 0  # Consumers blocked in read()
+        self.running = True
+
+        # Statistics
+        self.connected = self.opened
+        self.reconnects = 0
+        self.discarded = 0  # Grabbed frames nobody was waiting for
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        if self.opened:
+            self.thread.start()
+
+    def open(self):
+        cap = cv2.VideoCapture(self.url)
+        # Keep the backend's own queue as short as it allows
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if cap.isOpened():
+            self.properties = {prop: cap.get(prop) for prop in
+                               (cv2.CAP_PROP_FPS, cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT)}
+        return cap
+
+    def run(self):
+        """
+        Reader thread: grab frames, hand them to waiting consumers and reconnect on failure.
+        """
+        delay = self.initial_delay
+        try:
+            while self.running:
+                if not self.cap.grab():
+                    self.reconnect(delay)
+                    delay = min(delay * 2, self.max_delay)
+                    continue
+                delay = self.initial_delay
+                grabbed_at = time.monotonic()
+                with self.condition:
+                    if not self.waiting:
+                        self.discarded += 1
+                        continue
+                ret, frame = self.cap.retrieve()
+                if not ret:
+                    continue
+                with self.condition:
+                    self.frame = frame
+                    self.grab_time = grabbed_at
+                    self.condition.notify_all()
+        finally:
+            # Only this thread uses the capture, so it is released here once grab() has returned
+            self.cap.release()
+
+    def reconnect(self, delay):
+        """
+        Reopen the source after a delay.
+
+        Args:
+            delay (float): Seconds to wait first.
+        """
+        with self.condition:
+            self.connected = False
+        print(f"[LiveCapture] Stream lost, reconnecting in {delay:.1f} s: {self.url}")
+        self.cap.release()
+        deadline = time.monotonic() + delay
+        while self.running and time.monotonic() < deadline:
+            time.sleep(min(0.1, delay))
+        if not self.running:
+            return
+        self.cap = self.open()
+        if self.cap.isOpened():
+            with self.condition:
+                self.connected = True
+                self.reconnects += 1
+            print(f"[LiveCapture] Reconnected: {self.url}")
+
+    def read(self):
+        """
+        Wait for the next frame grabbed after the call.
+
+        Returns:
+            tuple: (True, frame), or (False, None) once the capture is released.
+        """
+        with self.condition:
+            self.waiting += 1
+            try:
+                self.frame = None
+                while self.running and self.frame is None:
+                    self.condition.wait(0.5)
+                if self.frame is None:
+                    return False, None
+                frame, self.frame = self.frame, None
+                self.frame_time = self.grab_time
+                return True, frame
+            finally:
+                self.waiting -= 1
+
+    def get(self, prop):
+        return self.properties.get(prop, 0.0)
+
+    def isOpened(self):
+        return self.opened and self.running
+
+    def get_statistics(self):
+        """
+        Get the connection statistics.
+
+        Returns:
+            dict: Whether the stream is connected, the number of reconnections and of
+                frames grabbed while nobody was waiting.
+        """
+        return {
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "discarded_frames": self.discarded,
+        }
+
+    def release(self):
+        """
+        Stop the reader thread, which closes the source once a pending grab() returns.
+        Does not wait for it, as a stalled stream can block grab() for the network timeout.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if not self.opened:
+            # The reader thread never started
+            self.cap.release()
@@ -0,0 +1,95 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from app.config.config import PREVIEW_CACHE_SIZE, PREVIEW_LIVE_TTL
+
+
+class PreviewCache:
+    """
+    LRU cache of JPEG preview frames used for calibration.
+
+    File previews are keyed by (cap_type, cap_path, file mtime), so a replaced file gets a
+    new preview; previews of live sources expire after live_ttl seconds. Concurrent requests
+    for the same source share one load instead of each opening the source.
+    """
+
+    def __init__(self, capacity=PREVIEW_CACHE_SIZE, live_ttl=PREVIEW_LIVE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            capacity (int): Maximum number of previews kept.
+            live_ttl (float): Seconds a preview of a camera or stream stays valid.
+        """
+        self.capacity = capacity
+        self.live_ttl = live_ttl
+        self.entries = OrderedDict()  # key -> (monotonic load time, jpeg bytes), least recently used first
+        self.loading = {}  # key -> {"done": Event, "jpeg": bytes, "error": Exception}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(cap_type, cap_path):
+        """
+        Build the cache key of a source.
+        """
+        mtime = None
+        if cap_type == "file":
+            try:
+                mtime = os.path.getmtime(os.path.join("./videos", cap_path))
+            except OSError:
+                pass
+        return cap_type, str(cap_path), mtime
+
+    def get(self, cap_type, cap_path, load):
+        """
+        Get the preview of a source, loading it if it is not cached.
+
+        Args:
+            cap_type (str): Capture source type.
+            cap_path (str): Capture source path.
+            load (callable): Returns the JPEG bytes of a fresh preview, raises on failure.
+
+        Returns:
+            bytes: The JPEG preview.
+        """
+        key = self.make_key(cap_type, cap_path)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (cap_type == "file" or time.monotonic() - entry[0] < self.live_ttl):
+                self.entries.move_to_end(key)
+                return entry[1]
+            pending = self.loading.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.loading[key] = {"done": threading.Event(), "jpeg": None, "error": None}
+
+        if not owner:
+            pending["done"].wait()
+            if pending["error"] is not None:
+                raise pending["error"]
+            return pending["jpeg"]
+
+        try:
+            pending["jpeg"] = load()
+        except Exception as e:
+            pending["error"] = e
+            raise
+        finally:
+            with self.lock:
+                del self.loading[key]
+                if pending["jpeg"] is not None:
+                    self.entries[key] = (time.monotonic(), pending["jpeg"])
+                    self.entries.move_to_end(key)
+                    while len(self.entries) > self.capacity:
+                        self.entries.popitem(last=False)
+            pending["done"].set()
+        return pending["jpeg"]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Global preview cache used by the routes
+preview_cache = PreviewCache()
@@ -0,0 +1,47 @@
+import json
+import threading
+
+
+class RingEventHub:
+    """
+    Worker-process stand-in for EventHub: statistics and events are written as JSON messages
+    into a SharedRing, the web process fans them out to its own EventHub. The ring takes a
+    single writer, so the inference and statistics threads of the worker take turns.
+    """
+
+    def __init__(self, ring, ready):
+        """
+        Initialize the hub.
+
+        Args:
+            ring (SharedRing): Ring receiving the messages.
+            ready (multiprocessing.Event): Set after every message to wake up the web process.
+        """
+        self.ring = ring
+        self.ready = ready
+        self.lock = threading.Lock()
+
+    def has_subscribers(self):
+        # Clients connect to the web process, which coalesces and drops on its own
+        return True
+
+    def send(self, message):
+        """
+        Write one message.
+
+        Args:
+            message (dict): JSON-serializable message.
+        """
+        payload = json.dumps(message, default=float).encode()
+        with self.lock:
+            sequence = self.ring.write(payload)
+        if sequence is None:
+            print(f"[RingEventHub] Message of type {list(message)} does not fit in a ring slot, dropped")
+            return
+        self.ready.set()
+
+    def publish(self, delta, events):
+        self.send({"delta": delta, "events": events})
+
+    def close(self):
+        pass
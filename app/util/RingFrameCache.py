@@ -0,0 +1,38 @@
+import time
+
+
+class RingFrameCache:
+    """
+    Worker-process stand-in for FrameCache: frames are published into a SharedRing and
+    consumer activity is read from a shared array the web process keeps up to date.
+    """
+
+    def __init__(self, ring, access, index, ready):
+        """
+        Initialize the cache.
+
+        Args:
+            ring (SharedRing): Ring receiving the frames of the view.
+            access (multiprocessing.Array): Monotonic time of the last consumer request of each view.
+            index (int): Index of the view in access.
+            ready (multiprocessing.Event): Set after every frame to wake up the web process.
+        """
+        self.ring = ring
+        self.access = access
+        self.index = index
+        self.ready = ready
+
+    def update(self, frame):
+        """
+        Publish a new frame.
+        """
+        if self.ring.write(frame) is None:
+            print(f"[RingFrameCache] Frame of shape {frame.shape} does not fit in a ring slot, dropped")
+            return
+        self.ready.set()
+
+    def is_active(self, timeout):
+        """
+        Whether a consumer has requested the view within timeout seconds.
+        """
+        return time.monotonic() - self.access[self.index] < timeout
@@ -0,0 +1,159 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class SharedRing:
+    """
+    Fixed-size ring of slots in a shared memory block, written by one process and read by others.
+
+    Every write gets the next sequence number. A slot header holds the sequence number of its
+    content together with the payload size and array shape; the writer clears the sequence
+    number while it copies, so a reader that finds the same sequence number before and after
+    copying knows the copy is consistent, and otherwise that the slot was overwritten.
+    Payloads are either uint8 arrays (frames) or bytes (messages).
+    """
+
+    LAYOUT = 3  # Ring header: number of slots, slot size, sequence number of the latest write
+    HEADER = 5  # Slot header: sequence number, payload size, height, width, channels
+
+    def __init__(self, name=None, slots=4, slot_size=0, create=False):
+        """
+        Create or attach to a ring.
+
+        Args:
+            name (str, optional): Name of the shared memory block, required to attach.
+            slots (int): Number of slots (creator only).
+            slot_size (int): Capacity of a slot in bytes (creator only).
+            create (bool): Whether to create the block.
+        """
+        if create:
+            size = 8 * (self.LAYOUT + self.HEADER * slots) + slots * slot_size
+            self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.owner = create
+
+        self.layout = np.ndarray((self.LAYOUT,), dtype=np.int64, buffer=self.memory.buf)
+        if create:
+            self.layout[:] = (slots, slot_size, 0)
+        self.slots, self.slot_size = int(self.layout[0]), int(self.layout[1])
+        self.headers = np.ndarray((self.slots, self.HEADER), dtype=np.int64, buffer=self.memory.buf,
+                                  offset=8 * self.LAYOUT)
+        self.data = np.ndarray((self.slots, self.slot_size), dtype=np.uint8, buffer=self.memory.buf,
+                               offset=8 * (self.LAYOUT + self.HEADER * self.slots))
+        if create:
+            self.headers[:] = 0
+
+    @property
+    def head(self):
+        """
+        Sequence number of the latest write, 0 before the first one.
+        """
+        return int(self.layout[2])
+
+    def write(self, payload):
+        """
+        Write a payload into the next slot.
+
+        Args:
+            payload (ndarray or bytes): A uint8 array of up to three dimensions, or bytes.
+
+        Returns:
+            int or None: The sequence number of the write, or None if the payload does not fit.
+        """
+        if isinstance(payload, np.ndarray):
+            shape = payload.shape + (0,) * (3 - payload.ndim)
+            data = payload.reshape(-1)
+        else:
+            shape = (0, 0, 0)
+            data = np.frombuffer(payload, dtype=np.uint8)
+        if data.size > self.slot_size:
+            return None
+
+        sequence = self.head + 1
+        slot = sequence % self.slots
+        header = self.headers[slot]
+        header[0] = 0  # Readers treat the slot as being written
+        self.data[slot, :data.size] = data
+        header[1:] = (data.size,) + shape
+        header[0] = sequence
+        self.layout[2] = sequence
+        return sequence
+
+    def read(self, sequence):
+        """
+        Copy the payload of a write out of the ring.
+
+        Args:
+            sequence (int): Sequence number of the write.
+
+        Returns:
+            ndarray, bytes or None: The payload (as written), or None if it was overwritten
+                or is not written yet.
+        """
+        if sequence <= 0 or sequence > self.head:
+            return None
+        header = self.headers[sequence % self.slots]
+        if header[0] != sequence:
+            return None
+        size, height, width, channels = (int(v) for v in header[1:])
+        data = self.data[sequence % self.slots, :size].copy()
+        if header[0] != sequence:
+            return None
+        if height == 0:
+            return data.tobytes()
+        return data.reshape(tuple(d for d in (height, width, channels) if d))
+
+    def read_latest(self, after=0):
+        """
+        Copy the latest payload if it is newer than a given write.
+
+        Args:
+            after (int): Sequence number of the last payload seen by the caller.
+
+        Returns:
+            tuple: (sequence number, payload), or (after, None) if there is nothing newer.
+        """
+        while True:
+            sequence = self.head
+            if sequence <= after:
+                return after, None
+            payload = self.read(sequence)
+            if payload is not None:
+                return sequence, payload
+
+    def read_since(self, after=0):
+        """
+        Copy every payload written after a given write that is still in the ring.
+
+        Args:
+            after (int): Sequence number of the last payload seen by the caller.
+
+        Returns:
+            tuple: (sequence number of the last payload returned, list of payloads,
+                number of payloads lost because the ring wrapped around).
+        """
+        head = self.head
+        first = max(after + 1, head - self.slots + 1)
+        payloads, lost = [], first - after - 1
+        for sequence in range(first, head + 1):
+            payload = self.read(sequence)
+            if payload is None:
+                lost += 1
+            else:
+                payloads.append(payload)
+        return max(after, head), payloads, lost
+
+    def close(self):
+        """
+        Detach from the ring, and remove it if this process created it.
+        """
+        # The views must go before the buffer they point into can be released
+        self.layout = self.headers = self.data = None
+        self.memory.close()
+        if self.owner:
+            try:
+                self.memory.unlink()
+            except FileNotFoundError:
+                pass
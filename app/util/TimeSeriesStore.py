@@ -0,0 +1,135 @@
+import time
+import numpy as np
+from app.config.config import STATS_RESOLUTIONS
+
+
+class TimeSeriesStore:
+    """
+    Rolling event counts in fixed-size ring buffers, one per resolution.
+
+    Each series (e.g. "vehicle:car", "crossing:truck", "long_stay:hot_zone") is a column
+    of every ring; each row is one time bucket. A single writer (the inference thread)
+    adds counts, readers take snapshots without any lock: the writer bumps a version
+    number before and after each write and readers retry when it changed under them.
+    """
+
+    def __init__(self, resolutions=STATS_RESOLUTIONS):
+        """
+        Initialize the store.
+
+        Args:
+            resolutions (dict): Resolution name -> (bucket length in seconds, number of buckets).
+        """
+        self.resolutions = dict(resolutions)
+        self.version = 0  # Odd while a write is in progress
+        # Replaced as a whole when a series is added, so readers always see a consistent layout
+        self.state = self.empty_state(())
+
+    def empty_state(self, series):
+        """
+        Allocate zeroed rings for the given series.
+        """
+        rings = {}
+        for name, (seconds, length) in self.resolutions.items():
+            rings[name] = (
+                np.full(length, -1, dtype=np.int64),  # Bucket number held by each row
+                np.zeros((length, len(series)), dtype=np.int64),
+            )
+        return tuple(series), {name: index for index, name in enumerate(series)}, rings
+
+    def add_series(self, names):
+        """
+        Add columns for new series, keeping the counts recorded so far.
+        """
+        series, _, rings = self.state
+        state = self.empty_state(series + tuple(names))
+        for name, (buckets, counts) in rings.items():
+            state[2][name][0][:] = buckets
+            state[2][name][1][:, :len(series)] = counts
+        self.state = state
+
+    def add(self, counts, timestamp=None):
+        """
+        Add event counts to the current bucket of every resolution. Must only be called
+        from one thread.
+
+        Args:
+            counts (dict): Series name -> count.
+            timestamp (float, optional): Time of the events, defaults to now.
+        """
+        if not counts:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        new_series = [name for name in counts if name not in self.state[1]]
+        self.version += 1
+        try:
+            if new_series:
+                self.add_series(new_series)
+            _, columns, rings = self.state
+            indices = [columns[name] for name in counts]
+            values = list(counts.values())
+            for name, (seconds, length) in self.resolutions.items():
+                buckets, ring = rings[name]
+                bucket = int(timestamp // seconds)
+                row = bucket % length
+                if buckets[row] != bucket:
+                    ring[row] = 0
+                    buckets[row] = bucket
+                ring[row, indices] += values
+        finally:
+            self.version += 1
+
+    def snapshot(self, resolution):
+        """
+        Get a consistent copy of one ring without blocking the writer.
+
+        Returns:
+            tuple: Series names, bucket numbers and counts of the ring.
+        """
+        while True:
+            version = self.version
+            if version % 2 == 0:
+                series, _, rings = self.state
+                buckets, counts = rings[resolution]
+                buckets, counts = buckets.copy(), counts.copy()
+                if self.version == version:
+                    return series, buckets, counts
+            time.sleep(0)
+
+    def query(self, resolution="minute", start=None, end=None):
+        """
+        Get the counts of a time range.
+
+        Args:
+            resolution (str): One of the configured resolutions.
+            start (float, optional): Start of the range (Unix time), defaults to the oldest bucket kept.
+            end (float, optional): End of the range (Unix time), defaults to now.
+
+        Returns:
+            dict: Bucket length, bucket start times and the counts of each series per bucket.
+        """
+        if resolution not in self.resolutions:
+            raise ValueError(f"Unknown resolution {resolution!r}, expected one of {list(self.resolutions)}")
+        seconds, length = self.resolutions[resolution]
+        last = int((time.time() if end is None else end) // seconds)
+        first = last - length + 1 if start is None else max(int(start // seconds), last - length + 1)
+        series, buckets, counts = self.snapshot(resolution)
+
+        wanted = np.arange(first, last + 1, dtype=np.int64)
+        rows = wanted % length
+        # Rows that still hold an older bucket, or were never written, count as zero
+        values = np.where((buckets[rows] == wanted)[:, None], counts[rows], 0)
+        return {
+            "resolution": resolution,
+            "bucket_seconds": seconds,
+            "timestamps": (wanted * seconds).tolist(),
+            "series": {name: values[:, index].tolist() for index, name in enumerate(series)},
+        }
+
+    def clear(self):
+        """
+        Remove all series and counts.
+        """
+        self.version += 1
+        self.state = self.empty_state(())
+        self.version += 1
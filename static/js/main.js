@@ -1,6 +1,7 @@
 $(document).ready(function() {
     let serviceId = null;
-    let statsInterval = null;
+    let statsSource = null;
+    let stats = {};
     
     // 监听源类型变化
     $('#source-type').change(function() {
@@ -124,56 +125,50 @@ $(document).ready(function() {
     function updateVideoStreams() {
         if (serviceId === null) return;
         
-        // 设置视频流URL（添加时间戳防止缓存）
-        const timestamp = new Date().getTime();
-        $('#raw-video').attr('src', '/api/getRowFrame/' + serviceId + '?' + timestamp);
-        $('#processed-video').attr('src', '/api/getProcessedFrame/' + serviceId + '?' + timestamp);
-        $('#birdview-video').attr('src', '/api/getBirdViewFrame/' + serviceId + '?' + timestamp);
-        
-        // 每30毫秒更新一次（大约33fps）
-        setTimeout(updateVideoStreams, 30);
+        // 使用MJPEG长连接，服务端在有新帧时推送
+        $('#raw-video').attr('src', '/api/streamRowFrame/' + serviceId);
+        $('#processed-video').attr('src', '/api/streamProcessedFrame/' + serviceId);
+        $('#birdview-video').attr('src', '/api/streamBirdViewFrame/' + serviceId);
     }
     
     // 开始更新统计信息
     function startStatsUpdate() {
-        // 每秒更新一次统计信息
-        statsInterval = setInterval(updateStats, 1000);
+        if (serviceId === null) return;
+        stopStatsUpdate();
+        stats = {};
+
+        // 服务端通过SSE推送统计增量和事件，无变化时不产生任何请求
+        statsSource = new EventSource('/api/streamEvents/' + serviceId);
+        statsSource.addEventListener('stats', function(event) {
+            Object.assign(stats, JSON.parse(event.data));
+            renderStats();
+        });
+        statsSource.onerror = function() {
+            console.error('统计信息推送连接中断，正在重连');
+        };
     }
     
     // 停止更新统计信息
     function stopStatsUpdate() {
-        if (statsInterval !== null) {
-            clearInterval(statsInterval);
-            statsInterval = null;
+        if (statsSource !== null) {
+            statsSource.close();
+            statsSource = null;
         }
     }
     
     // 更新统计信息
-    function updateStats() {
-        if (serviceId === null) return;
+    function renderStats() {
+        // 更新基本统计信息
+        $('#total-count').text(stats.total_count);
+        $('#long-stay-count').text(stats.long_stay_count);
+        $('#crossing-count').text(stats.crossing_count);
         
-        $.ajax({
-            url: '/api/getStatistics/' + serviceId,
-            type: 'POST',
-            success: function(data) {
-                const stats = data.statistics;
-                
-                // 更新基本统计信息
-                $('#total-count').text(stats.total_count);
-                $('#long-stay-count').text(stats.long_stay_count);
-                $('#crossing-count').text(stats.crossing_count);
-                
-                // 更新类别统计信息
-                const categoryList = $('#category-list');
-                categoryList.empty();
-                
-                Object.entries(stats.category_count).forEach(([category, count]) => {
-                    categoryList.append(`<div class="category-item">${category}: ${count}</div>`);
-                });
-            },
-            error: function() {
-                console.error('更新统计信息失败');
-            }
+        // 更新类别统计信息
+        const categoryList = $('#category-list');
+        categoryList.empty();
+        
+        Object.entries(stats.category_count || {}).forEach(([category, count]) => {
+            categoryList.append(`<div class="category-item">${category}: ${count}</div>`);
         });
     }
     
@@ -0,0 +1,70 @@
+import os
+import sys
+import threading
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.util.EventHub import EventHub
+from app.util.EventSubscriber import EventSubscriber
+
+
+class EventSubscriberTest(unittest.TestCase):
+
+    def test_statistics_deltas_are_coalesced(self):
+        subscriber = EventSubscriber()
+        subscriber.push_stats({"total_count": 1, "crossing_count": 0})
+        subscriber.push_stats({"total_count": 2})
+        self.assertEqual(subscriber.get(0), ({"total_count": 2, "crossing_count": 0}, []))
+        self.assertEqual(subscriber.get(0), ({}, []))
+
+    def test_events_are_queued_in_order(self):
+        subscriber = EventSubscriber(max_pending=4)
+        subscriber.push([1, 2])
+        subscriber.push([3])
+        self.assertEqual(subscriber.get(0), ({}, [1, 2, 3]))
+
+    def test_client_falling_behind_is_dropped(self):
+        subscriber = EventSubscriber(max_pending=2)
+        subscriber.push([1, 2])
+        subscriber.push([3])
+        self.assertTrue(subscriber.dropped)
+        self.assertIsNone(subscriber.get(0))
+
+    def test_get_wakes_up_on_push_and_close(self):
+        subscriber = EventSubscriber()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(subscriber.get(10)))
+        waiter.start()
+        subscriber.push(["event"])
+        waiter.join(5)
+        self.assertEqual(results, [({}, ["event"])])
+
+        waiter = threading.Thread(target=lambda: results.append(subscriber.get(10)))
+        waiter.start()
+        subscriber.close()
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertIsNone(results[-1])
+
+    def test_hub_drops_slow_clients_and_keeps_the_others(self):
+        hub = EventHub()
+        slow, fast = EventSubscriber(max_pending=1), hub.subscribe()
+        hub.subscribers = hub.subscribers + [slow]
+        hub.publish({"total_count": 1}, ["a"])
+        hub.publish({"total_count": 2}, ["b"])
+        self.assertEqual(hub.subscribers, [fast])
+        self.assertIsNone(slow.get(0))
+        self.assertEqual(fast.get(0), ({"total_count": 2}, ["a", "b"]))
+
+    def test_closed_hub_closes_new_subscribers(self):
+        hub = EventHub()
+        subscriber = hub.subscribe()
+        hub.close()
+        self.assertIsNone(subscriber.get(0))
+        self.assertIsNone(hub.subscribe().get(0))
+        self.assertFalse(hub.has_subscribers())
+
+
+if __name__ == "__main__":
+    unittest.main()
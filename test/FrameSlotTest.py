@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.util.FrameSlot import FrameSlot
+
+
+class FrameSlotTest(unittest.TestCase):
+
+    def test_latest_policy_drops_the_oldest_item(self):
+        slot = FrameSlot(FrameSlot.DROP_OLDEST)
+        for item in range(3):
+            self.assertTrue(slot.put(item))
+        self.assertEqual(slot.get(), 2)
+        self.assertEqual(slot.dropped, 2)
+
+    def test_all_policy_blocks_the_producer_until_there_is_room(self):
+        slot = FrameSlot(FrameSlot.PROCESS_ALL)
+        slot.put(0)
+        producer = threading.Thread(target=slot.put, args=(1,))
+        producer.start()
+        producer.join(0.2)
+        self.assertTrue(producer.is_alive())
+        self.assertEqual(slot.get(), 0)
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(slot.get(), 1)
+
+    def test_every_item_reaches_the_consumer_in_order(self):
+        slot = FrameSlot(FrameSlot.PROCESS_ALL)
+        received = []
+
+        def consume():
+            while True:
+                item = slot.get()
+                if item is None:
+                    break
+                received.append(item)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for item in range(1000):
+            slot.put(item)
+        slot.close()
+        consumer.join(5)
+        self.assertEqual(received, list(range(1000)))
+
+    def test_close_wakes_up_blocked_producers_and_consumers(self):
+        full, empty = FrameSlot(FrameSlot.PROCESS_ALL), FrameSlot(FrameSlot.PROCESS_ALL)
+        full.put(0)
+        results = {}
+        threads = [
+            threading.Thread(target=lambda: results.update(put=full.put(1))),
+            threading.Thread(target=lambda: results.update(get=empty.get())),
+        ]
+        for thread in threads:
+            thread.start()
+        full.close()
+        empty.close()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, {"put": False, "get": None})
+        # Items left in a closed slot are still handed out
+        self.assertEqual(full.get(), 0)
+        self.assertIsNone(full.get())
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            FrameSlot("newest")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import threading
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.model.InferenceScheduler import InferenceScheduler
+
+
+class FakeDetector:
+    """
+    Records the batches it is given and returns (frame, imgsz) as the result of each frame.
+    """
+
+    names = {0: "car"}
+    imgsz = 640
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    def predict_batch(self, frames, imgsz=None):
+        self.batches.append((list(frames), imgsz))
+        if self.error is not None:
+            raise self.error
+        return [(frame, imgsz) for frame in frames]
+
+
+class InferenceSchedulerTest(unittest.TestCase):
+
+    def submit(self, scheduler, frames, imgsz=None):
+        """
+        Submit frames from one thread per frame and collect what each thread got back.
+        """
+        results = {}
+
+        def predict(frame):
+            try:
+                results[frame] = scheduler.predict(frame, imgsz)
+            except Exception as e:
+                results[frame] = e
+
+        threads = [threading.Thread(target=predict, args=(frame,)) for frame in frames]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return results
+
+    def test_frames_of_all_clients_share_one_batch(self):
+        detector = FakeDetector()
+        scheduler = InferenceScheduler(detector, max_batch_size=8, max_delay=5)
+        for _ in range(4):
+            scheduler.register()
+        start_time = time.monotonic()
+        results = self.submit(scheduler, ["a", "b", "c", "d"])
+        # Dispatched as soon as every client submitted, not after max_delay
+        self.assertLess(time.monotonic() - start_time, 2)
+        self.assertEqual(results, {frame: (frame, 640) for frame in "abcd"})
+        self.assertEqual([sorted(frames) for frames, _ in detector.batches], [["a", "b", "c", "d"]])
+        self.assertEqual(scheduler.get_statistics()["mean_batch_size"], 4)
+
+    def test_batch_waits_at_most_max_delay(self):
+        detector = FakeDetector()
+        scheduler = InferenceScheduler(detector, max_delay=0.1)
+        scheduler.register()
+        scheduler.register()
+        start_time = time.monotonic()
+        self.assertEqual(scheduler.predict("a"), ("a", 640))
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.1)
+
+    def test_unregistered_clients_are_not_waited_for(self):
+        scheduler = InferenceScheduler(FakeDetector(), max_delay=5)
+        scheduler.register()
+        scheduler.register()
+        scheduler.unregister()
+        start_time = time.monotonic()
+        scheduler.predict("a")
+        self.assertLess(time.monotonic() - start_time, 2)
+
+    def test_batches_are_split_by_size_and_capacity(self):
+        detector = FakeDetector()
+        scheduler = InferenceScheduler(detector, max_batch_size=2, max_delay=0.05)
+        for _ in range(4):
+            scheduler.register()
+        results = self.submit(scheduler, ["a", "b", "c"], imgsz=320)
+        self.assertEqual(results, {frame: (frame, 320) for frame in "abc"})
+        self.assertTrue(all(len(frames) <= 2 and imgsz == 320 for frames, imgsz in detector.batches))
+
+    def test_errors_reach_every_frame_of_the_batch(self):
+        scheduler = InferenceScheduler(FakeDetector(error=RuntimeError("out of memory")), max_delay=5)
+        scheduler.register()
+        scheduler.register()
+        results = self.submit(scheduler, ["a", "b"])
+        self.assertEqual({frame: str(error) for frame, error in results.items()},
+                         {"a": "out of memory", "b": "out of memory"})
+
+
+if __name__ == "__main__":
+    unittest.main()
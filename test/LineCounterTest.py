@@ -0,0 +1,89 @@
+import os
+import sys
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.model.LineCounter import LineCounter
+
+
+def steps(*moves):
+    """
+    Build previous and current Nx4 positions from ((x0, y0), (x1, y1)) image steps,
+    with the bird's-eye columns left at the origin.
+    """
+    prev = np.zeros((len(moves), 4), dtype=np.float32)
+    curr = np.zeros((len(moves), 4), dtype=np.float32)
+    for row, (start, end) in enumerate(moves):
+        prev[row, :2], curr[row, :2] = start, end
+    return prev, curr
+
+
+class LineCounterTest(unittest.TestCase):
+
+    def setUp(self):
+        # a -> b points along +x, so its right-hand side is +y (image coordinates, y down)
+        self.counter = LineCounter({"gate": {"points": ((0, 0), (10, 0)), "space": "image"}})
+
+    def update(self, track_id, start, end, class_name="car"):
+        prev, curr = steps((start, end))
+        return self.counter.update([track_id], prev, curr, [class_name])
+
+    def test_direction_follows_the_side_of_a_to_b(self):
+        self.assertEqual(self.update(1, (5, -5), (5, 5)), [(1, "gate", "forward", "car")])
+        self.assertEqual(self.update(2, (5, 5), (5, -5)), [(2, "gate", "backward", "car")])
+
+    def test_step_beside_the_segment_does_not_cross(self):
+        self.assertEqual(self.update(1, (20, -5), (20, 5)), [])
+        self.assertEqual(self.update(1, (-1, -5), (-1, 5)), [])
+
+    def test_stopping_on_the_line_crosses_once(self):
+        # The line itself belongs to the right-hand side
+        self.assertEqual(self.update(1, (5, -5), (5, 0)), [(1, "gate", "forward", "car")])
+        self.assertEqual(self.update(1, (5, 0), (5, 5)), [])
+        self.assertEqual(self.update(2, (5, 5), (5, 0)), [])
+        self.assertEqual(self.update(2, (5, 0), (5, -5)), [(2, "gate", "backward", "car")])
+
+    def test_each_track_counts_once_per_direction(self):
+        for _ in range(3):
+            self.update(1, (5, -5), (5, 5))
+            self.update(1, (5, 5), (5, -5))
+        self.assertEqual(self.counter.get_counts(), {"gate": {"forward": {"car": 1}, "backward": {"car": 1}}})
+
+    def test_forgotten_track_counts_again(self):
+        self.update(1, (5, -5), (5, 5))
+        self.counter.forget([1])
+        self.update(1, (5, -5), (5, 5), "truck")
+        self.assertEqual(self.counter.get_counts()["gate"]["forward"], {"car": 1, "truck": 1})
+
+    def test_several_tracks_and_lines_in_one_pass(self):
+        counter = LineCounter({
+            "gate": {"points": ((0, 0), (10, 0))},
+            "exit": {"points": ((0, 20), (10, 20))},
+            "lane": {"points": ((0, 0), (0, 10)), "space": "birdview"},
+        })
+        prev, curr = steps(((5, -5), (5, 25)), ((5, 15), (5, 25)), ((5, 30), (5, 31)))
+        # Bird's-eye step of the last track from x = 5 to x = -5 across "lane" (pointing +y, right-hand side is -x)
+        prev[2, 2:], curr[2, 2:] = (5, 5), (-5, 5)
+        events = counter.update([1, 2, 3], prev, curr, ["car", "bus", "truck"])
+        self.assertCountEqual(events, [
+            (1, "gate", "forward", "car"),
+            (1, "exit", "forward", "car"),
+            (2, "exit", "forward", "bus"),
+            (3, "lane", "forward", "truck"),
+        ])
+
+    def test_reset_clears_counts_and_tracks(self):
+        self.update(1, (5, -5), (5, 5))
+        self.counter.reset()
+        self.assertEqual(self.counter.get_counts(), {"gate": {"forward": {}, "backward": {}}})
+        self.assertEqual(self.update(1, (5, -5), (5, 5)), [(1, "gate", "forward", "car")])
+
+    def test_unknown_space_is_rejected(self):
+        with self.assertRaises(ValueError):
+            LineCounter({"gate": {"points": ((0, 0), (10, 0)), "space": "world"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
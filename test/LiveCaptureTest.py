@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from app.util.LiveCapture import LiveCapture
+
+
+class LiveCaptureTest(unittest.TestCase):
+    """
+    A short video file stands in for the stream: it "drops" every time it ends.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.video_path = os.path.join(cls.directory.name, "stream.avi")
+        writer = cv2.VideoWriter(cls.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (160, 120))
+        for index in range(20):
+            writer.write(np.full((120, 160, 3), index * 10, dtype=np.uint8))
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_reads_frames_and_reports_properties(self):
+        cap = LiveCapture(self.video_path, initial_delay=0.01, max_delay=0.01)
+        try:
+            self.assertTrue(cap.isOpened())
+            ret, frame = cap.read()
+            self.assertTrue(ret)
+            self.assertEqual(frame.shape, (120, 160, 3))
+            self.assertIsNotNone(cap.frame_time)
+            self.assertEqual((cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), (160, 120))
+        finally:
+            cap.release()
+
+    def test_reconnects_when_the_stream_ends(self):
+        cap = LiveCapture(self.video_path, initial_delay=0.01, max_delay=0.01)
+        try:
+            deadline = time.monotonic() + 10
+            while cap.get_statistics()["reconnects"] < 2 and time.monotonic() < deadline:
+                self.assertTrue(cap.read()[0])
+            self.assertGreaterEqual(cap.get_statistics()["reconnects"], 2)
+        finally:
+            cap.release()
+
+    def test_release_wakes_up_a_waiting_reader(self):
+        # A long reconnection delay leaves read() waiting for a frame that never comes
+        cap = LiveCapture(self.video_path, initial_delay=60, max_delay=60)
+        results = []
+        reader = threading.Thread(target=lambda: results.extend(iter(cap.read, (False, None))))
+        reader.start()
+        time.sleep(0.5)
+        cap.release()
+        reader.join(5)
+        self.assertFalse(reader.is_alive())
+        cap.thread.join(5)
+        self.assertFalse(cap.thread.is_alive())
+        self.assertFalse(cap.isOpened())
+
+    def test_unreachable_source(self):
+        cap = LiveCapture(os.path.join(self.directory.name, "missing.avi"))
+        self.assertFalse(cap.isOpened())
+        cap.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.util.PreviewCache import PreviewCache
+
+
+class Loader:
+    """
+    Counts its calls and returns a preview naming the call, slowly enough for callers to overlap.
+    """
+
+    def __init__(self, delay=0.0, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"preview {self.calls}".encode()
+
+
+class PreviewCacheTest(unittest.TestCase):
+
+    def get_concurrently(self, cache, load, count=8):
+        results = []
+
+        def get():
+            try:
+                results.append(cache.get("ip_camera", "rtsp://camera", load))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=get) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return results
+
+    def test_concurrent_requests_share_one_load(self):
+        load = Loader(delay=0.2)
+        results = self.get_concurrently(PreviewCache(), load)
+        self.assertEqual(load.calls, 1)
+        self.assertEqual(results, [b"preview 1"] * 8)
+
+    def test_failed_load_reaches_every_waiter_and_is_not_cached(self):
+        cache = PreviewCache()
+        results = self.get_concurrently(cache, Loader(delay=0.2, error=ValueError("Failed to capture frame")))
+        self.assertEqual([str(result) for result in results], ["Failed to capture frame"] * 8)
+        self.assertEqual(cache.get("ip_camera", "rtsp://camera", Loader()), b"preview 1")
+
+    def test_live_previews_expire(self):
+        cache = PreviewCache(live_ttl=0.1)
+        load = Loader()
+        self.assertEqual(cache.get("camera", "0", load), b"preview 1")
+        self.assertEqual(cache.get("camera", "0", load), b"preview 1")
+        time.sleep(0.15)
+        self.assertEqual(cache.get("camera", "0", load), b"preview 2")
+
+    def test_least_recently_used_preview_is_evicted(self):
+        cache = PreviewCache(capacity=2)
+        load = Loader()
+        cache.get("ip_camera", "a", load)
+        cache.get("ip_camera", "b", load)
+        cache.get("ip_camera", "a", load)
+        cache.get("ip_camera", "c", load)
+        self.assertEqual([key[1] for key in cache.entries], ["a", "c"])
+        self.assertEqual(load.calls, 3)
+
+    def test_file_previews_follow_the_file_mtime(self):
+        # File sources are resolved under ./videos, like Camera.setCap does
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                os.mkdir("videos")
+                path = os.path.join("videos", "clip.mp4")
+                open(path, "wb").close()
+                cache, load = PreviewCache(), Loader()
+                self.assertEqual(cache.get("file", "clip.mp4", load), b"preview 1")
+                self.assertEqual(cache.get("file", "clip.mp4", load), b"preview 1")
+                os.utime(path, (0, 0))
+                self.assertEqual(cache.get("file", "clip.mp4", load), b"preview 2")
+            finally:
+                os.chdir(cwd)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import threading
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.util.RingEventHub import RingEventHub
+from app.util.SharedRing import SharedRing
+
+
+class RingEventHubTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedRing(slots=64, slot_size=256, create=True)
+        self.ready = threading.Event()
+        self.hub = RingEventHub(self.ring, self.ready)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_concurrent_senders_lose_no_messages(self):
+        # The worker's inference and statistics threads both send
+        writes, threads = 5000, 4
+
+        def send(sender):
+            for index in range(writes):
+                if sender % 2:
+                    self.hub.publish({"total_count": index}, [])
+                else:
+                    self.hub.send({"stats": {"sender": sender, "index": index}})
+
+        # Switch threads as often as possible to interleave the writes
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            senders = [threading.Thread(target=send, args=(sender,)) for sender in range(threads)]
+            for thread in senders:
+                thread.start()
+            for thread in senders:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+        # Every write got its own sequence number and the slots still in the ring are intact
+        self.assertEqual(self.ring.head, writes * threads)
+        sequence, messages, lost = self.ring.read_since(0)
+        self.assertEqual((sequence, len(messages)), (writes * threads, self.ring.slots))
+        for message in messages:
+            self.assertIn(next(iter(json.loads(message))), ("stats", "delta"))
+        self.assertTrue(self.ready.is_set())
+
+    def test_oversized_message_is_dropped(self):
+        self.hub.send({"stats": {"name": "x" * 1000}})
+        self.assertEqual(self.ring.head, 0)
+        self.assertFalse(self.ready.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
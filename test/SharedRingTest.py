@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.util.SharedRing import SharedRing
+
+
+class SharedRingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedRing(slots=4, slot_size=64, create=True)
+        self.reader = SharedRing(self.ring.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.ring.close()
+
+    def test_payloads_keep_their_type_and_shape(self):
+        frame = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+        gray = np.arange(12, dtype=np.uint8).reshape(3, 4)
+        sequences = [self.ring.write(payload) for payload in (frame, gray, b"message")]
+        self.assertEqual(sequences, [1, 2, 3])
+        np.testing.assert_array_equal(self.reader.read(1), frame)
+        np.testing.assert_array_equal(self.reader.read(2), gray)
+        self.assertEqual(self.reader.read(3), b"message")
+
+    def test_oversized_payload_is_not_written(self):
+        self.assertIsNone(self.ring.write(bytes(65)))
+        self.assertEqual(self.ring.head, 0)
+
+    def test_unwritten_and_overwritten_sequences_read_as_none(self):
+        self.assertIsNone(self.reader.read(0))
+        self.assertIsNone(self.reader.read(1))
+        for value in range(5):
+            self.ring.write(bytes([value]))
+        # Write 5 reused the slot of write 1
+        self.assertIsNone(self.reader.read(1))
+        self.assertEqual(self.reader.read(5), bytes([4]))
+
+    def test_slot_being_written_reads_as_none(self):
+        self.ring.write(b"a")
+        # State left by a writer between clearing the sequence number and setting it again
+        self.ring.headers[1, 0] = 0
+        self.assertIsNone(self.reader.read(1))
+        self.assertEqual(self.reader.read_since(0), (1, [], 1))
+
+    def test_read_latest_only_returns_newer_payloads(self):
+        self.assertEqual(self.reader.read_latest(0), (0, None))
+        self.ring.write(b"a")
+        self.ring.write(b"b")
+        self.assertEqual(self.reader.read_latest(0), (2, b"b"))
+        self.assertEqual(self.reader.read_latest(2), (2, None))
+
+    def test_read_since_reports_payloads_lost_to_wraparound(self):
+        for value in range(6):
+            self.ring.write(bytes([value]))
+        sequence, payloads, lost = self.reader.read_since(0)
+        self.assertEqual((sequence, lost), (6, 2))
+        self.assertEqual(payloads, [bytes([value]) for value in range(2, 6)])
+        self.assertEqual(self.reader.read_since(6), (6, [], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import threading
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.util.TimeSeriesStore import TimeSeriesStore
+
+RESOLUTIONS = {"second": (1, 10), "minute": (60, 5)}
+
+
+class TimeSeriesStoreTest(unittest.TestCase):
+
+    def test_counts_are_bucketed_per_resolution(self):
+        store = TimeSeriesStore(RESOLUTIONS)
+        store.add({"vehicle:car": 1}, timestamp=120.2)
+        store.add({"vehicle:car": 2, "vehicle:bus": 1}, timestamp=120.7)
+        store.add({"vehicle:car": 1}, timestamp=121.5)
+
+        seconds = store.query("second", start=120, end=121)
+        self.assertEqual(seconds["timestamps"], [120, 121])
+        self.assertEqual(seconds["series"], {"vehicle:car": [3, 1], "vehicle:bus": [1, 0]})
+        minutes = store.query("minute", start=120, end=121)
+        self.assertEqual(minutes["timestamps"], [120])
+        self.assertEqual(minutes["series"], {"vehicle:car": [4], "vehicle:bus": [1]})
+
+    def test_old_buckets_are_overwritten_and_read_as_zero(self):
+        store = TimeSeriesStore(RESOLUTIONS)
+        store.add({"crossing:car": 5}, timestamp=100)
+        # Same row of the 10-bucket ring, ten seconds later
+        store.add({"crossing:car": 1}, timestamp=110)
+        series = store.query("second", end=110)["series"]["crossing:car"]
+        self.assertEqual(len(series), 10)
+        self.assertEqual(series, [0] * 9 + [1])
+
+    def test_range_is_limited_to_the_buckets_kept(self):
+        store = TimeSeriesStore(RESOLUTIONS)
+        store.add({"vehicle:car": 1}, timestamp=50)
+        result = store.query("second", start=0, end=50)
+        self.assertEqual(result["timestamps"], list(range(41, 51)))
+
+    def test_unknown_resolution_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TimeSeriesStore(RESOLUTIONS).query("day")
+
+    def test_snapshots_are_consistent_under_a_concurrent_writer(self):
+        # Every add() bumps two series by the same amount, so a torn read shows them unequal
+        store = TimeSeriesStore({"second": (1, 4)})
+        done = threading.Event()
+
+        def write():
+            for index in range(20000):
+                store.add({"a": 1, "b": 1} if index % 50 else {"a": 1, "b": 1, f"new:{index}": 1},
+                          timestamp=index / 1000)
+            done.set()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        snapshots = 0
+        while not done.is_set():
+            series, buckets, counts = store.snapshot("second")
+            if "b" in series:
+                np.testing.assert_array_equal(counts[:, series.index("a")], counts[:, series.index("b")])
+            snapshots += 1
+        writer.join()
+        self.assertGreater(snapshots, 0)
+
+    def test_clear_removes_all_series(self):
+        store = TimeSeriesStore(RESOLUTIONS)
+        store.add({"vehicle:car": 1}, timestamp=10)
+        store.clear()
+        self.assertEqual(store.query("second", end=10)["series"], {})
+        self.assertEqual(store.version % 2, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.model.TrackStore import TrackStore
+
+
+def point(value):
+    return np.full((1, 4), value, dtype=np.float32)
+
+
+class TrackStoreTest(unittest.TestCase):
+
+    def test_trajectory_keeps_the_last_points_oldest_first(self):
+        store = TrackStore(history=3, max_age=10, capacity=2)
+        for frame_index in range(5):
+            store.update([7], point(frame_index), frame_index)
+        np.testing.assert_array_equal(store.get(7)[:, 0], [2, 3, 4])
+
+    def test_unknown_track_has_an_empty_trajectory(self):
+        store = TrackStore()
+        self.assertEqual(store.get(1).shape, (0, 4))
+
+    def test_last_point_and_known_mask(self):
+        store = TrackStore(history=2)
+        store.update([1, 2], np.array([[1, 1, 1, 1], [2, 2, 2, 2]], dtype=np.float32), 0)
+        store.update([1], point(3), 1)
+        points, known = store.last([2, 5, 1])
+        np.testing.assert_array_equal(known, [True, False, True])
+        np.testing.assert_array_equal(points[:, 0], [2, 0, 3])
+
+    def test_eviction_after_max_age(self):
+        store = TrackStore(max_age=2)
+        store.update([1], point(0), 0)
+        self.assertEqual(store.evict(2), [])
+        self.assertEqual(store.evict(3), [1])
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.get(1).shape, (0, 4))
+
+    def test_recycled_slot_starts_empty(self):
+        store = TrackStore(history=4, max_age=0, capacity=1)
+        store.update([1], point(1), 0)
+        store.update([1], point(1), 1)
+        store.evict(2)
+        store.update([2], point(2), 2)
+        self.assertEqual(store.slots, {2: 0})
+        np.testing.assert_array_equal(store.get(2)[:, 0], [2])
+
+    def test_growing_keeps_stored_tracks(self):
+        store = TrackStore(history=2, capacity=1)
+        store.update([1], point(1), 0)
+        store.update([2, 3], np.array([[2] * 4, [3] * 4], dtype=np.float32), 1)
+        self.assertEqual(len(store), 3)
+        for track_id in (1, 2, 3):
+            np.testing.assert_array_equal(store.get(track_id)[:, 0], [track_id])
+
+    def test_clear_frees_every_slot(self):
+        store = TrackStore(capacity=2)
+        store.update([1, 2], np.zeros((2, 4), dtype=np.float32), 0)
+        store.clear()
+        self.assertEqual(len(store), 0)
+        self.assertEqual(sorted(store.free_slots), [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
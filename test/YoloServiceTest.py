@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+import unittest
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from app.model.ModelRegistry import model_registry
+from app.service.YoloService import YoloService
+from app.util.FileCapture import FileCapture
+
+# Untrained network built from the ultralytics model definition, no weights needed
+MODEL_PATH = "yolov8n.yaml"
+SRC_POINTS = np.array([[400, 200], [880, 200], [100, 700], [1180, 700]], dtype=np.float32)
+
+
+class YoloServiceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.video_path = os.path.join(cls.directory.name, "video.avi")
+        # Large noisy frames keep the capture stage busy inside read()
+        writer = cv2.VideoWriter(cls.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (1280, 720))
+        noise = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+        for index in range(100):
+            writer.write(np.roll(noise, index, axis=1))
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def start_service(self, frame_policy):
+        service = YoloService(MODEL_PATH, SRC_POINTS, FileCapture(self.video_path), frame_policy=frame_policy)
+        thread = threading.Thread(target=service.start, daemon=True)
+        thread.start()
+        return service, thread
+
+    def test_release_while_capturing(self):
+        # Releasing from another thread used to free the capture under a running read()
+        for frame_policy in ("latest", "all") * 3:
+            with self.subTest(frame_policy=frame_policy):
+                service, thread = self.start_service(frame_policy)
+                self.assertIsNotNone(service.wait_for_frame(0, timeout=30))
+                service.release()
+                thread.join(30)
+                self.assertFalse(thread.is_alive())
+                self.assertIsNone(service.wait_for_frame(0))
+
+    def test_frames_are_published_read_only(self):
+        service, thread = self.start_service("all")
+        try:
+            service.wait_for_frame(0, timeout=30)
+            frame = service.get_row_frame()
+            self.assertEqual(frame.shape, (720, 1280, 3))
+            self.assertFalse(frame.flags.writeable)
+        finally:
+            service.release()
+            thread.join(30)
+
+    def test_invalid_lines_leave_no_detector_reference(self):
+        count = model_registry.active_count()
+        cap = FileCapture(self.video_path)
+        try:
+            with self.assertRaises(ValueError):
+                YoloService(MODEL_PATH, SRC_POINTS, cap,
+                            lines={"gate": {"points": [[0, 0], [10, 0]], "space": "world"}})
+        finally:
+            cap.release()
+        self.assertEqual(model_registry.active_count(), count)
+
+
+if __name__ == "__main__":
+    unittest.main()